@@ -0,0 +1,191 @@
+import contextvars
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Optional
+
+from pydantic_ai.usage import Usage, UsageLimits
+
+from app.metrics import count_tool_calls
+
+# Returned to the agent instead of a tool result once its tool budget is spent, so
+# it finishes with a partial profile rather than failing the run
+BUDGET_EXHAUSTED_MESSAGE = (
+    "Tool call budget for this task is exhausted. Do not call any more tools. "
+    "Return the final result now using only the data gathered so far, "
+    "with null for anything you could not find."
+)
+
+
+class ToolBudget:
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.used = 0
+        self.exhausted = False
+
+    def take(self) -> bool:
+        self.used += 1
+        if self.limit is not None and self.used > self.limit:
+            self.exhausted = True
+            return False
+        return True
+
+
+# Tool budget of the current agent run
+current_budget: contextvars.ContextVar[Optional[ToolBudget]] = contextvars.ContextVar(
+    "current_budget", default=None
+)
+
+
+def check_tool_budget() -> Optional[str]:
+    # The message to return instead of calling the tool, once the budget is spent
+    budget = current_budget.get()
+    if budget is None or budget.take():
+        return None
+    return BUDGET_EXHAUSTED_MESSAGE
+
+
+@dataclass
+class RunLimits:
+    tool_calls: Optional[int] = None
+    requests: Optional[int] = None
+    tokens: Optional[int] = None
+
+    def usage_limits(self) -> UsageLimits:
+        return UsageLimits(request_limit=self.requests, total_tokens_limit=self.tokens)
+
+    def exceeded(self, usage: Usage) -> str:
+        # Which cap stopped a run that raised UsageLimitExceeded: tokens are checked
+        # after each response, requests before the next one
+        if self.tokens is not None and (usage.total_tokens or 0) > self.tokens:
+            return "tokens"
+        return "requests"
+
+
+def percentile(values: list[int], pct: float) -> int:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class RunBudgets:
+    """Per-source caps on agent tool calls, model requests and tokens.
+
+    In adaptive mode each cap is the `pct` percentile of recent successful runs
+    times `headroom`, once `min_samples` runs are recorded, and never above the
+    configured cap. Run history is kept in SQLite so it survives restarts.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, RunLimits],
+        adaptive: bool = False,
+        pct: float = 95,
+        headroom: float = 1.5,
+        min_samples: int = 20,
+        history: int = 500,
+        path: str = "",
+    ):
+        self.configured = limits
+        self.adaptive = adaptive
+        self.pct = pct
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self.history = history
+        self._runs: dict[str, deque] = defaultdict(lambda: deque(maxlen=history))
+        self._conn = None
+        self._lock = threading.Lock()
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                " source TEXT NOT NULL,"
+                " tool_calls INTEGER NOT NULL,"
+                " requests INTEGER NOT NULL,"
+                " tokens INTEGER NOT NULL,"
+                " finished_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+            for source in limits:
+                rows = self._conn.execute(
+                    "SELECT tool_calls, requests, tokens FROM runs WHERE source = ?"
+                    " ORDER BY rowid DESC LIMIT ?",
+                    (source, history),
+                ).fetchall()
+                self._runs[source].extend(reversed(rows))
+
+    def limits(self, source: str) -> RunLimits:
+        configured = self.configured[source]
+        runs = self._runs[source]
+        if not self.adaptive or len(runs) < self.min_samples:
+            return configured
+
+        def learned(index: int) -> int:
+            value = percentile([run[index] for run in runs], self.pct)
+            return max(1, math.ceil(value * self.headroom))
+
+        def capped(value: int, cap: Optional[int]) -> int:
+            return value if cap is None else min(cap, value)
+
+        tool_calls = capped(learned(0), configured.tool_calls)
+        # Leave room for the request that returns the result after the tool budget
+        requests = capped(max(learned(1), tool_calls + 2), configured.requests)
+        return RunLimits(
+            tool_calls=tool_calls,
+            requests=requests,
+            # Models that report no token usage leave the configured token cap
+            tokens=(
+                capped(learned(2), configured.tokens)
+                if any(run[2] for run in runs)
+                else configured.tokens
+            ),
+        )
+
+    def record(self, source: str, result) -> None:
+        # Successful runs only, so the learned caps follow what a good run needs
+        run = (
+            count_tool_calls(result.all_messages()),
+            result.usage().requests,
+            result.usage().total_tokens or 0,
+        )
+        self._runs[source].append(run)
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO runs (source, tool_calls, requests, tokens, finished_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (source, *run, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM runs WHERE source = ? AND rowid NOT IN"
+                " (SELECT rowid FROM runs WHERE source = ?"
+                " ORDER BY rowid DESC LIMIT ?)",
+                (source, source, self.history),
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        stats = {}
+        for source in self.configured:
+            runs = self._runs[source]
+            observed = None
+            if runs:
+                observed = {
+                    field: percentile([run[i] for run in runs], self.pct)
+                    for i, field in enumerate(["tool_calls", "requests", "tokens"])
+                }
+            adaptive = self.adaptive and len(runs) >= self.min_samples
+            stats[source] = {
+                "mode": "adaptive" if adaptive else "static",
+                "samples": len(runs),
+                "limits": vars(self.limits(source)),
+                f"p{self.pct:g}": observed,
+            }
+        return stats
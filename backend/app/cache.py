@@ -0,0 +1,283 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_company_name(name: str) -> str:
+    # Unicode-normalize, collapse whitespace and casefold so trivial variants share a key
+    normalized = unicodedata.normalize("NFKC", name)
+    normalized = re.sub(r"\s+", " ", normalized)
+    return normalized.strip().casefold()
+
+
+class ResultCache:
+    """Key/value cache of JSON-serializable dicts with a TTL and a size bound.
+
+    Expired entries are kept for another `stale_ttl` seconds so they can still be
+    served (marked stale) while a fresh value is fetched in the background. Async
+    code uses the `a*` variants, which keep disk-backed lookups off the event loop.
+    """
+
+    # Whether lookups do disk I/O and should run in a thread
+    blocking = False
+
+    def __init__(self, ttl: float, max_size: int, stale_ttl: float = 0):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._get_entry(key)
+        if entry is None or entry[0] <= time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def get_stale(self, key: str) -> tuple[Optional[dict], bool]:
+        # (value, stale): expired entries still within the stale window are returned
+        entry = self._get_entry(key)
+        if entry is None:
+            self.misses += 1
+            return None, False
+        stale = entry[0] <= time.time()
+        if stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return entry[1], stale
+
+    def peek(self, key: str) -> Optional[tuple[float, dict]]:
+        # (expires_at, value) without counting a lookup or refreshing recency
+        return self._get_entry(key, touch=False)
+
+    def set(self, key: str, value: dict, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._set(key, value, expires_at)
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def size(self) -> int:
+        raise NotImplementedError
+
+    async def offload(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        # Runs fn (which uses this cache) in a thread if the cache blocks
+        if self.blocking:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+        return fn(*args, **kwargs)
+
+    async def aget(self, key: str) -> Optional[dict]:
+        return await self.offload(self.get, key)
+
+    async def aget_stale(self, key: str) -> tuple[Optional[dict], bool]:
+        return await self.offload(self.get_stale, key)
+
+    async def apeek(self, key: str) -> Optional[tuple[float, dict]]:
+        return await self.offload(self.peek, key)
+
+    async def aset(self, key: str, value: dict, ttl: Optional[float] = None) -> None:
+        await self.offload(self.set, key, value, ttl)
+
+    async def adelete(self, key: str) -> None:
+        await self.offload(self.delete, key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "size": self.size(),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (
+                round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+            ),
+        }
+
+    def _get_entry(self, key: str, touch: bool = True) -> Optional[tuple[float, dict]]:
+        # (expires_at, value), or None once the entry is past its stale window
+        raise NotImplementedError
+
+    def _set(self, key: str, value: dict, expires_at: float) -> None:
+        raise NotImplementedError
+
+
+class MemoryCache(ResultCache):
+    """In-process LRU cache."""
+
+    def __init__(self, ttl: float, max_size: int, stale_ttl: float = 0):
+        super().__init__(ttl, max_size, stale_ttl)
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def _get_entry(self, key: str, touch: bool = True) -> Optional[tuple[float, dict]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] + self.stale_ttl <= time.time():
+            del self._entries[key]
+            return None
+        if touch:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _set(self, key: str, value: dict, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(ResultCache):
+    """On-disk cache that survives restarts. Evicts least recently used entries.
+
+    Recency updates are batched in memory and written with the next `set` (or
+    every `TOUCH_BATCH` reads), so a cache hit does not cost a commit.
+    """
+
+    blocking = True
+    TOUCH_BATCH = 100
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float,
+        max_size: int,
+        table: str = "cache",
+        stale_ttl: float = 0,
+    ):
+        super().__init__(ttl, max_size, stale_ttl)
+        self._table = table
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only risks the last commits on power loss, fine for a cache
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._touched: dict[str, float] = {}
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)"
+        )
+        self._conn.commit()
+
+    def _get_entry(self, key: str, touch: bool = True) -> Optional[tuple[float, dict]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self._table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at + self.stale_ttl <= now:
+                self._touched.pop(key, None)
+                self._conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            if touch:
+                self._touched[key] = now
+                if len(self._touched) >= self.TOUCH_BATCH:
+                    self._flush_touches()
+                    self._conn.commit()
+        return expires_at, json.loads(value)
+
+    def _flush_touches(self) -> None:
+        # Caller holds the lock and commits
+        if self._touched:
+            self._conn.executemany(
+                f"UPDATE {self._table} SET accessed_at = ? WHERE key = ?",
+                [(at, key) for key, at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _set(self, key: str, value: dict, expires_at: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self._table} (key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+            self._touched.pop(key, None)
+            self._flush_touches()
+            overflow = self._size() - self.max_size
+            if overflow > 0:
+                self._conn.execute(
+                    f"DELETE FROM {self._table} WHERE expires_at <= ?",
+                    (now - self.stale_ttl,),
+                )
+                overflow = self._size() - self.max_size
+            if overflow > 0:
+                self._conn.execute(
+                    f"DELETE FROM {self._table} WHERE key IN"
+                    f" (SELECT key FROM {self._table} ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._touched.pop(key, None)
+            self._conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._size()
+
+    def _size(self) -> int:
+        return self._conn.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()[0]
+
+
+def create_cache(
+    backend: str,
+    ttl: float,
+    max_size: int,
+    path: str,
+    table: str = "cache",
+    stale_ttl: float = 0,
+) -> ResultCache:
+    if backend == "sqlite":
+        logger.info(
+            f"Using SQLite cache {path}:{table} (ttl={ttl}s, max_size={max_size})"
+        )
+        return SQLiteCache(path, ttl, max_size, table, stale_ttl)
+    if backend != "memory":
+        logger.warning(f"Unknown cache backend '{backend}', falling back to memory")
+    logger.info(f"Using in-memory cache (ttl={ttl}s, max_size={max_size})")
+    return MemoryCache(ttl, max_size, stale_ttl)
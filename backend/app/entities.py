@@ -0,0 +1,196 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Optional
+from urllib.parse import urlsplit
+
+from app.cache import normalize_company_name
+from app.models import LinkedInProfile
+
+logger = logging.getLogger(__name__)
+
+LEGAL_SUFFIXES = {
+    "inc",
+    "incorporated",
+    "llc",
+    "ltd",
+    "limited",
+    "corp",
+    "corporation",
+    "co",
+    "company",
+    "plc",
+    "gmbh",
+    "ag",
+    "sa",
+    "sas",
+    "bv",
+    "nv",
+    "oy",
+    "ab",
+    "pty",
+    "srl",
+    "spa",
+}
+
+
+def match_key(name: str) -> str:
+    # Normalized name without punctuation and trailing legal suffixes:
+    # "Stripe, Inc." and " stripe " both become "stripe"
+    words = re.sub(r"[^\w\s]", " ", normalize_company_name(name)).split()
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def anchor_for(profile: LinkedInProfile) -> Optional[str]:
+    # The LinkedIn company page identifies a company better than any name does,
+    # with the website domain as a fallback
+    for url in (profile.linkedin_url, profile.website):
+        if not url:
+            continue
+        parts = urlsplit(url if "://" in url else f"https://{url}")
+        host = re.sub(r"^(www\.|[a-z]{2,3}\.(?=linkedin\.))", "", parts.netloc.lower())
+        if not host:
+            continue
+        path = parts.path.rstrip("/").lower() if "linkedin." in host else ""
+        return f"{host}{path}"
+    return None
+
+
+class EntityIndex:
+    """Maps company name variants to one canonical company.
+
+    Companies are anchored on their LinkedIn page (or website) once a LinkedIn
+    profile resolves, so every name that led to the same page shares one cache
+    key. Aliases are kept in SQLite, with a trigram index in memory for typo
+    suggestions.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entities ("
+            " anchor TEXT PRIMARY KEY,"
+            " key TEXT NOT NULL,"
+            " name TEXT NOT NULL,"
+            " linkedin_url TEXT,"
+            " website TEXT,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS aliases ("
+            " alias TEXT PRIMARY KEY,"
+            " anchor TEXT NOT NULL REFERENCES entities (anchor))"
+        )
+        self._conn.commit()
+        self._aliases: dict[str, str] = {}
+        self._entities: dict[str, dict] = {}
+        self._postings: dict[str, set[str]] = defaultdict(set)
+        for anchor, key, name, linkedin_url, website in self._conn.execute(
+            "SELECT anchor, key, name, linkedin_url, website FROM entities"
+        ):
+            self._entities[anchor] = {
+                "anchor": anchor,
+                "key": key,
+                "name": name,
+                "linkedin_url": linkedin_url,
+                "website": website,
+            }
+        for alias, anchor in self._conn.execute("SELECT alias, anchor FROM aliases"):
+            self._add_alias(alias, anchor)
+
+    def _add_alias(self, alias: str, anchor: str) -> None:
+        self._aliases[alias] = anchor
+        for gram in trigrams(alias):
+            self._postings[gram].add(alias)
+
+    def resolve(self, name: str) -> Optional[dict]:
+        anchor = self._aliases.get(match_key(name))
+        return self._entities[anchor] if anchor is not None else None
+
+    def cache_key(self, name: str) -> str:
+        # Canonical key for the caches and in-flight dedup
+        entity = self.resolve(name)
+        return entity["key"] if entity else match_key(name)
+
+    def suggest(
+        self, name: str, limit: int = 5, min_similarity: float = 0.4
+    ) -> list[dict]:
+        # Known companies whose aliases look like `name` (trigram Jaccard similarity)
+        key = match_key(name)
+        grams = trigrams(key)
+        overlaps = Counter(
+            alias for gram in grams for alias in self._postings.get(gram, ())
+        )
+        best: dict[str, float] = {}
+        for alias, shared in overlaps.items():
+            score = shared / (len(grams) + len(trigrams(alias)) - shared)
+            anchor = self._aliases[alias]
+            if score >= min_similarity and score > best.get(anchor, 0):
+                best[anchor] = score
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [
+            {"name": self._entities[anchor]["name"], "similarity": round(score, 3)}
+            for anchor, score in ranked
+        ]
+
+    def record(self, name: str, profile: LinkedInProfile) -> Optional[dict]:
+        # Link `name` (and the profile's own name) to the company the profile is for
+        anchor = anchor_for(profile)
+        if anchor is None:
+            return None
+        aliases = {match_key(name), match_key(profile.company_name)} - {""}
+        with self._lock:
+            entity = self._entities.get(anchor)
+            if entity is None:
+                entity = {
+                    "anchor": anchor,
+                    "key": match_key(name),
+                    "name": profile.company_name,
+                    "linkedin_url": profile.linkedin_url,
+                    "website": profile.website,
+                }
+                self._entities[anchor] = entity
+                logger.info(f"New entity {anchor} for {name} (key {entity['key']})")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entities"
+                " (anchor, key, name, linkedin_url, website, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    anchor,
+                    entity["key"],
+                    entity["name"],
+                    entity["linkedin_url"],
+                    entity["website"],
+                    time.time(),
+                ),
+            )
+            for alias in aliases:
+                # An alias already linked to a company keeps it
+                if alias in self._aliases:
+                    continue
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO aliases (alias, anchor) VALUES (?, ?)",
+                    (alias, anchor),
+                )
+                self._add_alias(alias, anchor)
+            self._conn.commit()
+        return entity
+
+    def stats(self) -> dict:
+        return {"entities": len(self._entities), "aliases": len(self._aliases)}
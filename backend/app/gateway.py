@@ -0,0 +1,336 @@
+"""Shared MCP gateway: one process owns the Bright Data MCP pools for every worker.
+
+    python -m app.gateway --socket /tmp/reputato-mcp.sock
+
+API workers started with MCP_GATEWAY_SOCKET set talk to it through
+`GatewayMCPServer` instead of spawning their own `npx @brightdata/mcp` processes.
+The protocol is newline-delimited JSON over a unix socket; requests carry an `id`
+and may be answered out of order.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import itertools
+import json
+import logging
+import os
+import signal
+import time
+import uuid
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional
+
+from pydantic_ai.exceptions import ModelRetry
+from pydantic_ai.mcp import MCPServer
+from pydantic_ai.tools import ToolDefinition
+
+from app.budgets import check_tool_budget
+from app.limiter import record_tool_error
+from app.metrics import MCP_TOOL_DURATION
+from app.scrape_store import bypass_store_reuse, current_company
+
+logger = logging.getLogger(__name__)
+
+# Page text can be large; the default 64 KiB line limit is not enough
+LINE_LIMIT = 64 * 2**20
+
+# Gateway lease the current agent run holds, so all of its tool calls (e.g. browser
+# navigate then get_text) reach the same MCP server process
+current_lease: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_lease", default=None
+)
+
+
+class GatewayError(RuntimeError):
+    pass
+
+
+@dataclass
+class GatewayMCPServer(MCPServer):
+    """MCP server stand-in that forwards to the shared gateway over a unix socket."""
+
+    socket_path: str = ""
+    source: str = ""
+
+    async def __aenter__(self) -> "GatewayMCPServer":
+        self._reader, self._writer = await asyncio.open_unix_connection(
+            self.socket_path, limit=LINE_LIMIT
+        )
+        self._ids = itertools.count()
+        self._pending: dict[int, asyncio.Future] = {}
+        self._write_lock = asyncio.Lock()
+        self._reader_task = asyncio.create_task(self._read_responses())
+        self.is_running = True
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.is_running = False
+        self._reader_task.cancel()
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+        self._fail_pending(GatewayError("Gateway connection closed"))
+
+    @asynccontextmanager
+    async def client_streams(self):
+        raise NotImplementedError("GatewayMCPServer does not speak MCP directly")
+        yield
+
+    def _get_log_level(self):
+        return None
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def _read_responses(self) -> None:
+        try:
+            while line := await self._reader.readline():
+                response = json.loads(line)
+                future = self._pending.pop(response["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except (ConnectionError, OSError, ValueError) as e:
+            logger.warning(f"Gateway connection for {self.source} failed: {e!r}")
+        self.is_running = False
+        self._fail_pending(GatewayError("Gateway connection lost"))
+
+    async def _request(self, op: str, **payload) -> Any:
+        if not self.is_running:
+            raise GatewayError("Gateway connection is not open")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        line = json.dumps(
+            {"id": request_id, "op": op, "source": self.source, **payload}
+        )
+        try:
+            async with self._write_lock:
+                self._writer.write(line.encode() + b"\n")
+                await self._writer.drain()
+            response = await future
+        finally:
+            self._pending.pop(request_id, None)
+        if "error" in response:
+            if response.get("retry"):
+                raise ModelRetry(response["error"])
+            if response.get("unavailable"):
+                # mcp_pool imports this module
+                from app.mcp_pool import NoServerAvailableError
+
+                raise NoServerAvailableError(response["error"])
+            raise GatewayError(response["error"])
+        return response.get("result")
+
+    async def list_tools(self) -> list[ToolDefinition]:
+        tools = await self._request("list_tools")
+        return [ToolDefinition(**tool) for tool in tools]
+
+    async def health(self) -> dict:
+        # Health of the gateway's own pool for this source
+        return await self._request("health")
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any]) -> Any:
+        started = time.perf_counter()
+        outcome = "success"
+        try:
+            exhausted = check_tool_budget()
+            if exhausted is not None:
+                outcome = "budget"
+                return exhausted
+            return await self._request(
+                "call_tool",
+                tool=tool_name,
+                arguments=arguments,
+                lease=current_lease.get(),
+                company=current_company.get(),
+                bypass_store_reuse=bypass_store_reuse.get(),
+            )
+        except Exception as e:
+            outcome = "error"
+            if isinstance(e, ModelRetry):
+                record_tool_error(e.message)
+            raise
+        finally:
+            MCP_TOOL_DURATION.observe(
+                time.perf_counter() - started,
+                source=self.source,
+                tool=tool_name,
+                outcome=outcome,
+            )
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[str]:
+        # Pin every tool call made inside this block to one gateway server process
+        lease_id = await self._request("acquire")
+        token = current_lease.set(lease_id)
+        try:
+            yield lease_id
+        finally:
+            current_lease.reset(token)
+            try:
+                await self._request("release", lease=lease_id)
+            except GatewayError:
+                pass
+
+
+class MCPGateway:
+    """Serves MCP tool calls from API workers using this process's MCP pools."""
+
+    def __init__(self, pools: dict):
+        self.pools = pools
+        self.connections = 0
+        self.requests = 0
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        leases: dict[str, tuple[AsyncExitStack, Any]] = {}
+        tasks: set[asyncio.Task] = set()
+        write_lock = asyncio.Lock()
+
+        async def answer(request: dict) -> None:
+            from app.mcp_pool import NoServerAvailableError
+
+            response = {"id": request.get("id")}
+            try:
+                response["result"] = await self.dispatch(request, leases)
+            except ModelRetry as e:
+                response.update(error=e.message, retry=True)
+            except NoServerAvailableError as e:
+                # Raised again on the worker, which then abandons the run rather
+                # than counting a zone failure
+                response.update(error=str(e), unavailable=True)
+            except Exception as e:
+                response["error"] = f"{type(e).__name__}: {e}"
+            try:
+                encoded = json.dumps(response)
+            except (TypeError, ValueError) as e:
+                # A result that can't be encoded must still get an answer, or the
+                # worker waits on it forever
+                logger.error(f"Gateway could not encode {request.get('op')}: {e!r}")
+                encoded = json.dumps(
+                    {"id": response["id"], "error": f"{type(e).__name__}: {e}"}
+                )
+            try:
+                async with write_lock:
+                    writer.write(encoded.encode() + b"\n")
+                    await writer.drain()
+            except (ConnectionError, OSError):
+                pass
+
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(answer(json.loads(line)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, OSError, ValueError) as e:
+            logger.warning(f"Gateway client connection failed: {e!r}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for stack, _ in leases.values():
+                await stack.aclose()
+            writer.close()
+            self.connections -= 1
+
+    async def dispatch(self, request: dict, leases: dict) -> Any:
+        self.requests += 1
+        op = request["op"]
+        pool = self.pools[request["source"]]
+        if op == "health":
+            return pool.health()
+        if op == "acquire":
+            stack = AsyncExitStack()
+            member = await stack.enter_async_context(pool.acquire())
+            lease_id = uuid.uuid4().hex
+            leases[lease_id] = (stack, member)
+            return lease_id
+        if op == "release":
+            stack, _ = leases.pop(request["lease"], (None, None))
+            if stack is not None:
+                await stack.aclose()
+            return None
+        if op == "list_tools":
+            # Probes and tool discovery are not agent runs, so don't take a member
+            tools = await pool.pick().server.list_tools()
+            return [
+                {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "parameters_json_schema": tool.parameters_json_schema,
+                }
+                for tool in tools
+            ]
+        if op == "call_tool":
+            company = request.get("company")
+            current_company.set(tuple(company) if company else None)
+            bypass_store_reuse.set(request.get("bypass_store_reuse", False))
+            lease = leases.get(request.get("lease"))
+            if lease is not None:
+                return await lease[1].server.call_tool(
+                    request["tool"], request["arguments"]
+                )
+            async with pool.acquire() as member:
+                return await member.server.call_tool(
+                    request["tool"], request["arguments"]
+                )
+        raise ValueError(f"Unknown gateway op {op}")
+
+
+async def serve(socket_path: str) -> None:
+    # The gateway builds the real MCP pools from the same settings as the API
+    os.environ.pop("MCP_GATEWAY_SOCKET", None)
+    from app import main
+    from app.mcp_pool import supervise
+
+    pools = {source: pool for source, (pool, _, _) in main.SOURCES.items()}
+    gateway = MCPGateway(pools)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await asyncio.gather(
+        *(pool.start(main.MCP_STARTUP_TIMEOUT) for pool in pools.values())
+    )
+    supervisor = asyncio.create_task(
+        supervise(list(pools.values()), main.MCP_HEALTH_INTERVAL)
+    )
+    pruner = main.start_store_pruning()
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = await asyncio.start_unix_server(
+        gateway.handle, socket_path, limit=LINE_LIMIT
+    )
+    logger.info(f"MCP gateway listening on {socket_path}")
+    try:
+        await stop.wait()
+    finally:
+        server.close()
+        supervisor.cancel()
+        if pruner is not None:
+            pruner.cancel()
+        await asyncio.gather(*(pool.stop() for pool in pools.values()))
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        logger.info("MCP gateway stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--socket",
+        default=os.getenv("MCP_GATEWAY_SOCKET", "/tmp/reputato-mcp.sock"),
+        help="Unix socket to listen on",
+    )
+    args = parser.parse_args()
+    asyncio.run(serve(args.socket))
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Job:
+    def __init__(self, name: str, refresh: bool = False):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.refresh = refresh
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.profiles: dict[str, Optional[dict]] = {}
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "profiles": dict(self.profiles),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobStore:
+    """Job records in SQLite, so any API worker sharing the file can report on a
+    job accepted by another. Methods block on SQLite, so async code calls them
+    through `asyncio.to_thread`.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " finished_at REAL)"
+        )
+        self._conn.commit()
+
+    def save(self, job: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, data, finished_at) VALUES (?, ?, ?)",
+                (job["job_id"], json.dumps(job), job["finished_at"]),
+            )
+            self._conn.commit()
+
+    def load(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def prune(self, cutoff: float) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE finished_at < ?", (cutoff,))
+            self._conn.commit()
+
+
+class JobQueue:
+    """Bounded queue of analysis jobs drained by a fixed number of workers.
+
+    Jobs run in the worker that accepted them, but their state is kept in the
+    shared `store` so they can be polled on any worker.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Job], Awaitable[None]],
+        workers: int,
+        max_size: int,
+        job_ttl: float,
+        store: JobStore,
+    ):
+        self.handler = handler
+        self.workers = workers
+        self.job_ttl = job_ttl
+        self.store = store
+        self._queue: asyncio.Queue[Job] = asyncio.Queue(maxsize=max_size)
+        self._tasks: list[asyncio.Task] = []
+        self._avg_duration = 60.0
+        self.running = 0
+        self.rejected = 0
+
+    async def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+        logger.info(
+            f"Started {self.workers} job workers (queue size {self._queue.maxsize})"
+        )
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Jobs nobody will run anymore must not look queued on the other workers
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            job.status = "failed"
+            job.error = "Cancelled"
+            job.finished_at = time.time()
+            await self.save(job)
+
+    async def submit(self, name: str, refresh: bool = False) -> Job:
+        job = Job(name, refresh)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError(self.retry_after())
+        await self.save(job)
+        logger.info(f"Queued job {job.id} for {name}")
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        await asyncio.to_thread(self.store.prune, time.time() - self.job_ttl)
+        return await asyncio.to_thread(self.store.load, job_id)
+
+    async def save(self, job: Job) -> None:
+        # Snapshot on the event loop; the handler keeps updating the job meanwhile
+        await asyncio.to_thread(self.store.save, job.to_dict())
+
+    def retry_after(self) -> int:
+        # Rough time until a queue slot frees up, from the recent job duration
+        waiting = self._queue.qsize() + 1
+        return max(1, math.ceil(self._avg_duration * waiting / self.workers))
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": self._queue.qsize(),
+            "max_queued": self._queue.maxsize,
+            "rejected": self.rejected,
+            "avg_duration": round(self._avg_duration, 3),
+        }
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            self.running += 1
+            try:
+                await self.save(job)
+                await self.handler(job)
+                job.status = "done"
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "Cancelled"
+                raise
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {e}", exc_info=True)
+                job.status = "failed"
+                job.error = str(e) or type(e).__name__
+            finally:
+                self.running -= 1
+                job.finished_at = time.time()
+                duration = job.finished_at - job.started_at
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+                self._queue.task_done()
+                await self.save(job)
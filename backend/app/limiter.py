@@ -0,0 +1,167 @@
+import asyncio
+import contextvars
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+logger = logging.getLogger(__name__)
+
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+# MCP tool errors (failed scrapes) during the current source run. The agent only
+# sees them as retries, so a run that then fails on the model side can still be
+# the zone's fault.
+current_tool_errors: contextvars.ContextVar[Optional[list[str]]] = (
+    contextvars.ContextVar("current_tool_errors", default=None)
+)
+
+
+def record_tool_error(message: str) -> None:
+    errors = current_tool_errors.get()
+    if errors is not None:
+        errors.append(message)
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, zone: str, retry_after: float):
+        super().__init__(f"Circuit open for {zone}, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class ZoneLimiter:
+    """Adaptive concurrency limit and circuit breaker for one Bright Data zone.
+
+    The limit grows by roughly one slot per `limit` fast successes and is cut by
+    `backoff` on a failure or a run slower than its source's target latency
+    (AIMD). After `failure_threshold` failures in a row the breaker opens and
+    `check` rejects runs for `open_for` seconds; then a single trial run decides
+    whether it closes again.
+    """
+
+    def __init__(
+        self,
+        zone: str,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        backoff: float = 0.5,
+        decrease_cooldown: float = 10,
+        failure_threshold: int = 5,
+        open_for: float = 60,
+    ):
+        self.zone = zone
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.backoff = backoff
+        self.decrease_cooldown = decrease_cooldown
+        self.failure_threshold = failure_threshold
+        self.open_for = open_for
+        self.state = "closed"
+        self.in_flight = 0
+        self.waiting = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._decreased_at = 0.0
+        self._trial = False
+        self._slots = asyncio.Condition()
+
+    def check(self) -> bool:
+        # Raises CircuitOpenError while the breaker is open; True if the caller's
+        # run is the half-open trial
+        if self.state == "open":
+            remaining = self._opened_at + self.open_for - time.monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.zone, remaining)
+            self.state = "half_open"
+            logger.info(f"Circuit for {self.zone} half-open, sending a trial run")
+        if self.state == "half_open":
+            if self._trial:
+                self.rejected += 1
+                raise CircuitOpenError(self.zone, self.open_for)
+            self._trial = True
+            return True
+        return False
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        async with self._slots:
+            self.waiting += 1
+            try:
+                await self._slots.wait_for(lambda: self.in_flight < int(self.limit))
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._slots:
+                self.in_flight -= 1
+                self._slots.notify_all()
+
+    def record_success(self, latency: float, target_latency: float) -> None:
+        self.failures = 0
+        if self.state == "half_open":
+            self._close()
+        if latency > target_latency:
+            self._decrease(f"slow run ({latency:.1f}s)")
+            return
+        # Runs waiting for a slot pick up the new limit when the next one is released
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._decrease("failure")
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self._open()
+
+    def record_abandoned(self, trial: bool) -> None:
+        # Run cancelled or not attempted: no signal about the zone either way, so
+        # if it was the trial, let the next run be one
+        if trial:
+            self._trial = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+            "opened": self.opened,
+        }
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        # One decrease per cooldown, so a burst of failures from the same
+        # overload does not collapse the limit all the way down
+        if now - self._decreased_at < self.decrease_cooldown:
+            return
+        self._decreased_at = now
+        limit = max(self.min_limit, self.limit * self.backoff)
+        if int(limit) < int(self.limit):
+            logger.info(
+                f"Concurrency limit for {self.zone} {int(self.limit)} -> "
+                f"{int(limit)} after {reason}"
+            )
+        self.limit = limit
+
+    def _open(self) -> None:
+        self.state = "open"
+        self._trial = False
+        self._opened_at = time.monotonic()
+        self.opened += 1
+        logger.warning(
+            f"Circuit for {self.zone} open after {self.failures} failures, "
+            f"skipping it for {self.open_for}s"
+        )
+
+    def _close(self) -> None:
+        self.state = "closed"
+        self._trial = False
+        logger.info(f"Circuit for {self.zone} closed")
@@ -0,0 +1,103 @@
+import json
+import logging
+import re
+from typing import Any, Optional
+
+from pydantic import ValidationError
+from pydantic_ai.mcp import MCPServer
+
+from app.cache import normalize_company_name
+from app.entities import match_key
+from app.models import LinkedInProfile
+
+logger = logging.getLogger(__name__)
+
+LINKEDIN_COMPANY_URL = re.compile(
+    r"https?://(?:[a-z]{2,3}\.)?linkedin\.com/company/[A-Za-z0-9\-_%.]+"
+)
+
+
+def _as_text(value: Any) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value if v) or None
+    return str(value)
+
+
+def first_record(result: Any) -> Optional[dict]:
+    if isinstance(result, str):
+        try:
+            result = json.loads(result)
+        except ValueError:
+            return None
+    if isinstance(result, list):
+        result = result[0] if result else None
+    return result if isinstance(result, dict) else None
+
+
+def map_linkedin_record(record: dict) -> LinkedInProfile:
+    # Field names as returned by Bright Data's LinkedIn company dataset
+    return LinkedInProfile(
+        company_name=record.get("name"),
+        description=_as_text(record.get("about") or record.get("description")),
+        number_of_employees=_as_text(
+            record.get("company_size") or record.get("employees_in_linkedin")
+        ),
+        linkedin_url=_as_text(record.get("url")),
+        headquarters=_as_text(record.get("headquarters")),
+        founded=_as_text(record.get("founded")),
+        industry=_as_text(record.get("industries") or record.get("industry")),
+        website=_as_text(record.get("website")),
+    )
+
+
+def guess_linkedin_url(name: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", normalize_company_name(name)).strip("-")
+    return f"https://www.linkedin.com/company/{slug}"
+
+
+async def find_linkedin_url(server: MCPServer, name: str) -> str:
+    try:
+        result = await server.call_tool(
+            "search_engine", {"query": f"{name} site:linkedin.com/company"}
+        )
+        match = LINKEDIN_COMPANY_URL.search(
+            result if isinstance(result, str) else json.dumps(result)
+        )
+        if match:
+            return match.group(0)
+    except Exception as e:
+        logger.debug(f"LinkedIn URL search failed for {name}: {e}")
+    return guess_linkedin_url(name)
+
+
+async def fetch_linkedin_direct(
+    server: MCPServer, name: str
+) -> Optional[LinkedInProfile]:
+    # Structured tool call mapped straight onto LinkedInProfile, no LLM involved.
+    # Returns None when the tool fails or the result doesn't look like this company.
+    url = await find_linkedin_url(server, name)
+    try:
+        result = await server.call_tool(
+            "web_data_linkedin_company_profile", {"url": url}
+        )
+    except Exception as e:
+        logger.info(f"LinkedIn tool failed for {name} ({url}): {e}")
+        return None
+
+    record = first_record(result)
+    if record is None:
+        logger.info(f"LinkedIn tool returned no usable record for {name} ({url})")
+        return None
+    try:
+        profile = map_linkedin_record(record)
+    except ValidationError as e:
+        logger.info(f"LinkedIn record for {name} failed validation: {e}")
+        return None
+    if match_key(profile.company_name) != match_key(name):
+        logger.info(
+            f"LinkedIn record for {name} is for '{profile.company_name}', ignoring"
+        )
+        return None
+    return profile
@@ -1,24 +1,65 @@
 from fastapi import FastAPI, Query, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
 from dotenv import load_dotenv
 from contextlib import asynccontextmanager
 import asyncio
+import contextlib
+import contextvars
+import functools
+import json
 import os
+import shlex
+import time
 import logging
+from typing import Optional
 
-from pydantic_ai import Agent
+from pydantic_ai import Agent, capture_run_messages
+from pydantic_ai.mcp import MCPServer
+from mcp.shared.exceptions import McpError
+from pydantic_ai.exceptions import UnexpectedModelBehavior, UsageLimitExceeded
 from pydantic_ai.settings import ModelSettings
-from pydantic_ai.mcp import MCPServerStdio
+from pydantic_ai.usage import Usage
 
 from app.models import (
+    BatchRequest,
     CompanyResponse,
     LinkedInProfile,
     GlassdoorProfile,
     CrunchbaseProfile,
     NewsProfile,
 )
-from app.summarizer import summarize_company
+from app.summarizer import summarize_company, summarize_company_stream, summary_memo
+from app.cache import create_cache
+from app.entities import EntityIndex
+from app.singleflight import Broadcast, FlightClaims, SingleFlight
+from app.mcp_pool import MCPPool, NoServerAvailableError, SourceMCPServer, supervise
+from app.limiter import (
+    BREAKER_STATES,
+    CircuitOpenError,
+    ZoneLimiter,
+    current_tool_errors,
+)
+from app.budgets import RunBudgets, RunLimits, ToolBudget, current_budget
+from app.gateway import GatewayError, GatewayMCPServer
+from app import metrics, reducer
+from app.jobs import Job, JobQueue, JobStore, QueueFullError
+from app.refresher import RefreshRequests, Refresher, Watchlist, claim_lock
+from app.linkedin import fetch_linkedin_direct
+from app.scrape_store import (
+    ScrapeStore,
+    bypass_store_reuse,
+    current_company,
+    prune_periodically,
+)
+from app.reextract import create_extract_agent, reextract_profile
+from app.prompts import (
+    build_linkedin_prompt,
+    build_glassdoor_prompt,
+    build_crunchbase_prompt,
+    build_news_prompt,
+)
 import logfire
 
 # Load env and configure logging
@@ -54,6 +95,76 @@ REQUEST_TIMEOUT = 300
 DATA_FETCH_TIMEOUT = 300
 SUMMARIZATION_TIMEOUT = 120
 
+# Each source gets its own deadline; after GOOD_ENOUGH_TIMEOUT we summarize with
+# whatever arrived as long as MIN_SOURCES_FOR_SUMMARY sources are available.
+SOURCE_TIMEOUT = int(os.getenv("SOURCE_TIMEOUT", "180"))
+SOURCE_TIMEOUTS = {
+    source: min(
+        int(os.getenv(f"{source.upper()}_TIMEOUT", str(SOURCE_TIMEOUT))),
+        DATA_FETCH_TIMEOUT,
+    )
+    for source in ["linkedin", "glassdoor", "crunchbase", "news"]
+}
+GOOD_ENOUGH_TIMEOUT = int(os.getenv("GOOD_ENOUGH_TIMEOUT", "90"))
+MIN_SOURCES_FOR_SUMMARY = int(os.getenv("MIN_SOURCES_FOR_SUMMARY", "1"))
+# "warm": stragglers keep running until their own deadline and fill the cache
+# "cancel": stragglers are cancelled once nobody else is waiting on them
+STRAGGLER_POLICY = os.getenv("STRAGGLER_POLICY", "warm")
+
+# Result cache: "memory" (LRU, per process) or "sqlite" (on disk, survives restarts)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "cache.db")
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", str(6 * 60 * 60)))
+RESULT_CACHE_MAX_SIZE = int(os.getenv("RESULT_CACHE_MAX_SIZE", "1000"))
+# Summaries written without the sources dropped at the good-enough cutoff are
+# only cached this long, so the next lookup picks up the stragglers
+PARTIAL_RESULT_CACHE_TTL = int(os.getenv("PARTIAL_RESULT_CACHE_TTL", str(15 * 60)))
+
+# Stale-while-revalidate: expired entries are still served for this long while the
+# background refresher fetches a fresh copy
+REFRESH_ENABLED = os.getenv("REFRESH_ENABLED", "true").lower() == "true"
+RESULT_STALE_TTL = int(os.getenv("RESULT_STALE_TTL", str(24 * 60 * 60)))
+PROFILE_STALE_TTL = int(os.getenv("PROFILE_STALE_TTL", str(7 * 24 * 60 * 60)))
+
+result_cache = create_cache(
+    CACHE_BACKEND,
+    RESULT_CACHE_TTL,
+    RESULT_CACHE_MAX_SIZE,
+    CACHE_DB_PATH,
+    "results",
+    stale_ttl=RESULT_STALE_TTL if REFRESH_ENABLED else 0,
+)
+
+# Per-source profile cache: each source goes stale at its own pace
+PROFILE_CACHE_TTLS = {
+    "linkedin": int(os.getenv("LINKEDIN_CACHE_TTL", str(7 * 24 * 60 * 60))),
+    "glassdoor": int(os.getenv("GLASSDOOR_CACHE_TTL", str(3 * 24 * 60 * 60))),
+    "crunchbase": int(os.getenv("CRUNCHBASE_CACHE_TTL", str(3 * 24 * 60 * 60))),
+    "news": int(os.getenv("NEWS_CACHE_TTL", str(24 * 60 * 60))),
+}
+PROFILE_CACHE_MAX_SIZE = int(os.getenv("PROFILE_CACHE_MAX_SIZE", "4000"))
+
+profile_cache = create_cache(
+    CACHE_BACKEND,
+    max(PROFILE_CACHE_TTLS.values()),
+    PROFILE_CACHE_MAX_SIZE,
+    CACHE_DB_PATH,
+    "profiles",
+    stale_ttl=PROFILE_STALE_TTL if REFRESH_ENABLED else 0,
+)
+
+# Entity index: name variants ("stripe", "Stripe, Inc.") that resolve to the same
+# LinkedIn page share one cache key
+ENTITY_DB_PATH = os.getenv("ENTITY_DB_PATH", "entities.db")
+SUGGEST_MIN_SIMILARITY = float(os.getenv("SUGGEST_MIN_SIMILARITY", "0.4"))
+
+entity_index = EntityIndex(ENTITY_DB_PATH)
+
+
+def company_key(name: str) -> str:
+    return entity_index.cache_key(name)
+
+
 # Shared system prompt
 system_prompt = (
     "You are a tool-using agent connected to Bright Data's MCP server. "
@@ -74,108 +185,265 @@ system_prompt = (
     "Do not invoke any other tools even if they are available."
 )
 
-# Initialize MCP servers
-glassdoor_server = MCPServerStdio(
-    command="npx",
-    args=["@brightdata/mcp"],
-    env={
-        "API_TOKEN": os.getenv("BRIGHTDATA_API_TOKEN"),
-        "WEB_UNLOCKER_ZONE": os.getenv("BRIGHTDATA_GLASSDOOR_UNLOCKER_ZONE"),
-        "BROWSER_AUTH": os.getenv("BROWSER_AUTH_GLASSDOOR", ""),
-    },
+news_system_prompt = (
+    "You are a tool-using OSINT agent connected to Bright Data's MCP server. "
+    "Your job is to search for public news related to companies from 2023-2025. "
+    "You must identify any major events including layoffs, scandals, or achievements. "
+    "Only include verifiable news events. Do not hallucinate or assume. "
+    "Use search tools and extract only clearly dated, relevant headlines. "
+    "Return up to 3 short bullet summaries per category."
 )
 
-linkedin_server = MCPServerStdio(
-    command="npx",
-    args=["@brightdata/mcp"],
-    env={
-        "API_TOKEN": os.getenv("BRIGHTDATA_API_TOKEN"),
-        "WEB_UNLOCKER_ZONE": os.getenv("BRIGHTDATA_LINKEDIN_UNLOCKER_ZONE"),
-        "BROWSER_AUTH": os.getenv("BROWSER_AUTH_LINKEDIN", ""),
-    },
-)
+# Map the structured LinkedIn tool output directly, using the agent only as fallback
+LINKEDIN_FAST_PATH = os.getenv("LINKEDIN_FAST_PATH", "true").lower() == "true"
+linkedin_paths = {"direct": 0, "fallback": 0}
 
-crunchbase_server = MCPServerStdio(
-    command="npx",
-    args=["@brightdata/mcp"],
-    env={
-        "API_TOKEN": os.getenv("BRIGHTDATA_API_TOKEN"),
-        "WEB_UNLOCKER_ZONE": os.getenv("BRIGHTDATA_CRUNCHBASE_UNLOCKER_ZONE"),
-        "BROWSER_AUTH": os.getenv("BROWSER_AUTH_CRUNCHBASE", ""),
-    },
-)
+# Number of MCP server processes per source, overridable per source
+# (e.g. GLASSDOOR_MCP_POOL_SIZE=3)
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "1"))
 
-news_server = MCPServerStdio(
-    command="npx",
-    args=["@brightdata/mcp"],
-    env={
-        "API_TOKEN": os.getenv("BRIGHTDATA_API_TOKEN"),
-        "WEB_UNLOCKER_ZONE": os.getenv("BRIGHTDATA_NEWS_UNLOCKER_ZONE"),
-        "BROWSER_AUTH": os.getenv("BROWSER_AUTH_NEWS", ""),
-    },
-)
+# MCP server supervision: readiness probe on start, periodic liveness probes after
+MCP_STARTUP_TIMEOUT = int(os.getenv("MCP_STARTUP_TIMEOUT", "60"))
+MCP_HEALTH_INTERVAL = int(os.getenv("MCP_HEALTH_INTERVAL", "30"))
+MCP_PROBE_TIMEOUT = int(os.getenv("MCP_PROBE_TIMEOUT", "10"))
+MCP_MAX_PROBE_FAILURES = int(os.getenv("MCP_MAX_PROBE_FAILURES", "2"))
+MCP_RESTART_BACKOFF = float(os.getenv("MCP_RESTART_BACKOFF", "5"))
 
-# Initialize agents
-linkedin_agent = Agent(
-    model,
-    output_type=LinkedInProfile,
-    mcp_servers=[linkedin_server],
-    retries=1,
-    system_prompt=system_prompt,
-    model_settings=ModelSettings(request_timeout=REQUEST_TIMEOUT, max_tokens=2048),
-)
 
-glassdoor_agent = Agent(
-    model,
-    output_type=GlassdoorProfile,
-    mcp_servers=[glassdoor_server],
-    retries=1,
-    system_prompt=system_prompt,
-    model_settings=ModelSettings(request_timeout=REQUEST_TIMEOUT, max_tokens=2048),
-)
+# Command used to launch each MCP server (overridable, e.g. for the benchmark stub)
+MCP_COMMAND = os.getenv("MCP_COMMAND", "npx")
+MCP_ARGS = shlex.split(os.getenv("MCP_ARGS", "@brightdata/mcp"))
+
+
+# Trim scraped pages to the relevant lines before they reach the agents
+TOOL_OUTPUT_REDUCTION = os.getenv("TOOL_OUTPUT_REDUCTION", "true").lower() == "true"
+TOOL_OUTPUT_MAX_CHARS = int(os.getenv("TOOL_OUTPUT_MAX_CHARS", "12000"))
+
+
+# Raw scrape store: every page fetched is kept (compressed, deduplicated by content)
+# so profiles can be re-extracted without scraping again. Empty dir disables it.
+SCRAPE_STORE_DIR = os.getenv("SCRAPE_STORE_DIR", "scrapes")
+# Repeat fetches of the same URL within this many seconds are served from the store
+SCRAPE_REUSE_TTL = int(os.getenv("SCRAPE_REUSE_TTL", str(24 * 60 * 60)))
+
+# Fetches older than SCRAPE_STORE_MAX_AGE are forgotten, and the least recently
+# fetched pages are dropped once the blobs take more than SCRAPE_STORE_MAX_BYTES
+SCRAPE_STORE_MAX_AGE = int(os.getenv("SCRAPE_STORE_MAX_AGE", str(30 * 24 * 60 * 60)))
+SCRAPE_STORE_MAX_BYTES = int(os.getenv("SCRAPE_STORE_MAX_BYTES", str(2 * 2**30)))
+SCRAPE_STORE_PRUNE_INTERVAL = int(os.getenv("SCRAPE_STORE_PRUNE_INTERVAL", "3600"))
 
-crunchbase_agent = Agent(
-    model,
-    output_type=CrunchbaseProfile,
-    mcp_servers=[crunchbase_server],
-    retries=1,
-    system_prompt=system_prompt,
-    model_settings=ModelSettings(request_timeout=REQUEST_TIMEOUT, max_tokens=2048),
+scrape_store = ScrapeStore(SCRAPE_STORE_DIR) if SCRAPE_STORE_DIR else None
+
+
+def start_store_pruning() -> Optional[asyncio.Task]:
+    if scrape_store is None:
+        return None
+    return asyncio.create_task(
+        prune_periodically(
+            scrape_store,
+            SCRAPE_STORE_PRUNE_INTERVAL,
+            SCRAPE_STORE_MAX_AGE,
+            SCRAPE_STORE_MAX_BYTES,
+        )
+    )
+
+
+# Production mode (run.py --prod): the MCP pools live in a shared gateway process
+# (python -m app.gateway) and every worker reaches them over this unix socket
+MCP_GATEWAY_SOCKET = os.getenv("MCP_GATEWAY_SOCKET")
+
+
+def create_mcp_server(source: str) -> MCPServer:
+    if MCP_GATEWAY_SOCKET:
+        return GatewayMCPServer(socket_path=MCP_GATEWAY_SOCKET, source=source)
+    return SourceMCPServer(
+        source=source,
+        reduce_output=TOOL_OUTPUT_REDUCTION,
+        max_output_chars=TOOL_OUTPUT_MAX_CHARS,
+        store=scrape_store,
+        reuse_ttl=SCRAPE_REUSE_TTL,
+        command=MCP_COMMAND,
+        args=MCP_ARGS,
+        env={
+            "API_TOKEN": os.getenv("BRIGHTDATA_API_TOKEN"),
+            "WEB_UNLOCKER_ZONE": os.getenv(
+                f"BRIGHTDATA_{source.upper()}_UNLOCKER_ZONE"
+            ),
+            "BROWSER_AUTH": os.getenv(f"BROWSER_AUTH_{source.upper()}", ""),
+        },
+    )
+
+
+def create_pool(
+    source: str, output_type, retries: int = 1, prompt: str = system_prompt
+) -> MCPPool:
+    size = int(os.getenv(f"{source.upper()}_MCP_POOL_SIZE", str(MCP_POOL_SIZE)))
+    members = []
+    for _ in range(size):
+        server = create_mcp_server(source)
+        agent = Agent(
+            model,
+            output_type=output_type,
+            mcp_servers=[server],
+            retries=retries,
+            system_prompt=prompt,
+            model_settings=ModelSettings(
+                request_timeout=REQUEST_TIMEOUT, max_tokens=2048
+            ),
+        )
+        members.append((agent, server))
+    return MCPPool(
+        source,
+        members,
+        probe_timeout=MCP_PROBE_TIMEOUT,
+        max_probe_failures=MCP_MAX_PROBE_FAILURES,
+        restart_backoff=MCP_RESTART_BACKOFF,
+        start_timeout=MCP_STARTUP_TIMEOUT,
+    )
+
+
+# Initialize MCP server pools and their agents
+linkedin_pool = create_pool("linkedin", LinkedInProfile)
+glassdoor_pool = create_pool("glassdoor", GlassdoorProfile)
+crunchbase_pool = create_pool("crunchbase", CrunchbaseProfile)
+news_pool = create_pool("news", NewsProfile, retries=2, prompt=news_system_prompt)
+
+SOURCES = {
+    "linkedin": (linkedin_pool, LinkedInProfile, build_linkedin_prompt),
+    "glassdoor": (glassdoor_pool, GlassdoorProfile, build_glassdoor_prompt),
+    "crunchbase": (crunchbase_pool, CrunchbaseProfile, build_crunchbase_prompt),
+    "news": (news_pool, NewsProfile, build_news_prompt),
+}
+
+# State shared by the API workers: job records, refresh requests and claims on
+# in-flight analyses
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", "state.db")
+# Seconds between checks while another worker analyzes the same company, and
+# before the claim of a worker that died is taken over
+FLIGHT_POLL_INTERVAL = float(os.getenv("FLIGHT_POLL_INTERVAL", "1"))
+FLIGHT_CLAIM_TTL = float(os.getenv("FLIGHT_CLAIM_TTL", "30"))
+
+# Concurrent identical lookups share one in-flight task, and analyses also one
+# claim across workers (which only helps when they share the result cache)
+company_flight = SingleFlight("company")
+source_flight = SingleFlight("source")
+flight_claims = (
+    FlightClaims(STATE_DB_PATH, FLIGHT_CLAIM_TTL) if CACHE_BACKEND == "sqlite" else None
 )
 
-news_agent = Agent(
-    model,
-    output_type=NewsProfile,
-    mcp_servers=[news_server],
-    retries=2,
-    system_prompt=(
-        "You are a tool-using OSINT agent connected to Bright Data's MCP server. "
-        "Your job is to search for public news related to companies from 2023-2025. "
-        "You must identify any major events including layoffs, scandals, or achievements. "
-        "Only include verifiable news events. Do not hallucinate or assume. "
-        "Use search tools and extract only clearly dated, relevant headlines. "
-        "Return up to 3 short bullet summaries per category."
-    ),
-    model_settings=ModelSettings(request_timeout=REQUEST_TIMEOUT, max_tokens=2048),
+
+def flight_key(cache_key: str, refresh: bool) -> str:
+    # A refresh must not join a lookup that may be answered from cached profiles
+    # or stored pages
+    return f"{cache_key}:refresh" if refresh else cache_key
+
+
+# Adaptive concurrency and circuit breaking per Bright Data unlocker zone: the limit
+# follows observed failures and latency, and a failure streak skips the source for
+# ZONE_BREAKER_COOLDOWN seconds instead of letting every request wait it out
+ZONE_MIN_CONCURRENCY = int(os.getenv("ZONE_MIN_CONCURRENCY", "1"))
+ZONE_MAX_CONCURRENCY = int(os.getenv("ZONE_MAX_CONCURRENCY", "16"))
+# Runs slower than this shrink the limit: half the source's deadline unless
+# ZONE_TARGET_LATENCY (or e.g. GLASSDOOR_TARGET_LATENCY) is set
+ZONE_TARGET_LATENCIES = {
+    source: float(
+        os.getenv(f"{source.upper()}_TARGET_LATENCY")
+        or os.getenv("ZONE_TARGET_LATENCY")
+        or deadline / 2
+    )
+    for source, deadline in SOURCE_TIMEOUTS.items()
+}
+ZONE_BREAKER_FAILURES = int(os.getenv("ZONE_BREAKER_FAILURES", "5"))
+ZONE_BREAKER_COOLDOWN = int(os.getenv("ZONE_BREAKER_COOLDOWN", "60"))
+
+
+def create_zone_limiters() -> dict[str, ZoneLimiter]:
+    # Sources configured with the same zone share one limiter, sized for all of
+    # their MCP servers
+    zones = {
+        source: os.getenv(f"BRIGHTDATA_{source.upper()}_UNLOCKER_ZONE")
+        for source in SOURCES
+    }
+    servers = {}
+    for source, (pool, _, _) in SOURCES.items():
+        servers[zones[source]] = servers.get(zones[source], 0) + len(pool.members)
+    by_zone = {
+        zone: ZoneLimiter(
+            zone,
+            initial=2 * size,
+            min_limit=ZONE_MIN_CONCURRENCY,
+            max_limit=ZONE_MAX_CONCURRENCY,
+            failure_threshold=ZONE_BREAKER_FAILURES,
+            open_for=ZONE_BREAKER_COOLDOWN,
+        )
+        for zone, size in servers.items()
+    }
+    return {source: by_zone[zone] for source, zone in zones.items()}
+
+
+zone_limiters = create_zone_limiters()
+
+
+# Per-source caps on agent tool calls, model requests and total tokens (empty means
+# no cap; e.g. CRUNCHBASE_MAX_TOOL_CALLS=10). A run out of tool calls is told to
+# return what it has; one over the request or token cap fails and the source is
+# left out. "adaptive" learns tighter caps from the runs that succeeded.
+def env_limit(name: str, source: str, default: str) -> Optional[int]:
+    value = os.getenv(f"{source.upper()}_{name}", os.getenv(f"AGENT_{name}", default))
+    return int(value) if value else None
+
+
+AGENT_BUDGET_MODE = os.getenv("AGENT_BUDGET_MODE", "static")
+AGENT_BUDGET_DB_PATH = os.getenv("AGENT_BUDGET_DB_PATH", "budgets.db")
+
+run_budgets = RunBudgets(
+    {
+        source: RunLimits(
+            tool_calls=env_limit("MAX_TOOL_CALLS", source, "20"),
+            requests=env_limit("MAX_REQUESTS", source, "30"),
+            tokens=env_limit("MAX_TOKENS", source, ""),
+        )
+        for source in SOURCES
+    },
+    adaptive=AGENT_BUDGET_MODE == "adaptive",
+    pct=float(os.getenv("AGENT_BUDGET_PERCENTILE", "95")),
+    headroom=float(os.getenv("AGENT_BUDGET_HEADROOM", "1.5")),
+    min_samples=int(os.getenv("AGENT_BUDGET_MIN_SAMPLES", "20")),
+    path=AGENT_BUDGET_DB_PATH,
 )
 
 
 # Lifespan: keep MCP servers running between requests
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    server_ctxs = [
-        linkedin_agent.run_mcp_servers(),
-        glassdoor_agent.run_mcp_servers(),
-        crunchbase_agent.run_mcp_servers(),
-        news_agent.run_mcp_servers(),
-    ]
-    for ctx in server_ctxs:
-        await ctx.__aenter__()
+    pools = [pool for pool, _, _ in SOURCES.values()]
+    supervisor = None
+    pruner = None
+    refresh_lock = None
     try:
+        await asyncio.gather(*(pool.start(MCP_STARTUP_TIMEOUT) for pool in pools))
+        supervisor = asyncio.create_task(supervise(pools, MCP_HEALTH_INTERVAL))
+        # With a gateway the store is written, and pruned, by the gateway process
+        if not MCP_GATEWAY_SOCKET:
+            pruner = start_store_pruning()
+        await job_queue.start()
+        if REFRESH_ENABLED:
+            refresh_lock = claim_lock(REFRESH_LOCK_PATH) if REFRESH_LOCK_PATH else None
+            if refresh_lock is not None or not REFRESH_LOCK_PATH:
+                await refresher.start()
+            else:
+                logger.info("Background refresher runs in another worker")
         yield
     finally:
-        for ctx in server_ctxs:
-            await ctx.__aexit__(None, None, None)
+        await refresher.stop()
+        if refresh_lock is not None:
+            refresh_lock.close()
+        await job_queue.stop()
+        if supervisor is not None:
+            supervisor.cancel()
+        if pruner is not None:
+            pruner.cancel()
+        await asyncio.gather(*(pool.stop() for pool in pools))
 
 
 app = FastAPI(lifespan=lifespan)
@@ -190,137 +458,982 @@ app.add_middleware(
 API_KEY = os.getenv("REPUTATO_API_KEY")
 
 
-@app.get("/analyze_company", response_model=CompanyResponse)
-async def analyze_company(
-    name: str = Query(..., description="Company name"), x_api_key: str = Header(...)
-):
-    logger.info(f"Analyzing company: {name}")
+def check_api_key(x_api_key: str):
     if x_api_key != API_KEY:
         raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@app.get("/cache/stats")
+async def cache_stats(x_api_key: str = Header(...)):
+    check_api_key(x_api_key)
+    return {
+        "result_cache": result_cache.stats(),
+        "profile_cache": profile_cache.stats(),
+        "summary_memo": summary_memo.stats(),
+        "in_flight": {
+            "company": company_flight.stats(),
+            "source": source_flight.stats(),
+            "claims": flight_claims.stats() if flight_claims else None,
+        },
+        "jobs": job_queue.stats(),
+        "refresher": refresher.stats(),
+        "scrape_store": scrape_store.stats() if scrape_store else None,
+        "entities": entity_index.stats(),
+    }
+
+
+async def source_health(pool: MCPPool) -> dict:
+    # Behind a gateway the worker's pool only tracks its connections, so ask the
+    # gateway about the MCP servers themselves
+    health = pool.health()
+    if not MCP_GATEWAY_SOCKET or not health["ready"]:
+        return health
+    try:
+        return await asyncio.wait_for(pool.pick().server.health(), MCP_PROBE_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Gateway health check for {pool.source} failed: {e!r}")
+        return {**health, "status": "down", "ready": 0}
+
+
+@app.get("/healthz")
+async def healthz():
+    healths = await asyncio.gather(
+        *(source_health(pool) for pool, _, _ in SOURCES.values())
+    )
+    sources = dict(zip(SOURCES, healths))
+    statuses = {health["status"] for health in sources.values()}
+    # Requests are still summarized from the sources that are up, so only report
+    # down (503) when none of them is
+    if statuses == {"down"}:
+        status = "down"
+    elif statuses == {"ok"}:
+        status = "ok"
+    else:
+        status = "degraded"
+    return JSONResponse(
+        {"status": status, "sources": sources},
+        status_code=503 if status == "down" else 200,
+    )
+
+
+@app.get("/companies/resolve")
+async def resolve_company(
+    name: str = Query(..., description="Company name"),
+    x_api_key: str = Header(...),
+):
+    # Local lookup only: never triggers a scrape
+    check_api_key(x_api_key)
+    entity = entity_index.resolve(name)
+    return {
+        "name": name,
+        "key": company_key(name),
+        "known": entity is not None,
+        "entity": entity,
+        "suggestions": (
+            []
+            if entity is not None
+            else entity_index.suggest(name, min_similarity=SUGGEST_MIN_SIMILARITY)
+        ),
+    }
+
+
+@app.get("/pool/stats")
+async def pool_stats(x_api_key: str = Header(...)):
+    check_api_key(x_api_key)
+    return {
+        **{source: pool.stats() for source, (pool, _, _) in SOURCES.items()},
+        "linkedin_paths": linkedin_paths,
+        "tool_output": reducer.stats_summary(),
+        "budgets": run_budgets.stats(),
+        "zones": {
+            limiter.zone: limiter.stats() for limiter in set(zone_limiters.values())
+        },
+    }
+
+
+async def run_source(source: str, name: str):
+    pool, _, build_prompt = SOURCES[source]
+    current_company.set((company_key(name), name))
+    async with pool.acquire() as member:
+        if source == "linkedin" and LINKEDIN_FAST_PATH:
+            started = time.perf_counter()
+            profile = await fetch_linkedin_direct(member.server, name)
+            elapsed = time.perf_counter() - started
+            path = "direct" if profile is not None else "fallback"
+            linkedin_paths[path] += 1
+            metrics.FAST_PATH_DURATION.observe(
+                elapsed, source=source, outcome="hit" if profile is not None else "miss"
+            )
+            logger.info(f"LinkedIn {path} path for {name} took {elapsed:.2f}s")
+            if profile is not None:
+                return profile
+        limits = run_budgets.limits(source)
+        budget = ToolBudget(limits.tool_calls)
+        current_budget.set(budget)
+        usage = Usage()
+        with capture_run_messages() as messages:
+            try:
+                result = await member.agent.run(
+                    build_prompt(name), usage_limits=limits.usage_limits(), usage=usage
+                )
+            except UsageLimitExceeded as e:
+                metrics.BUDGET_EXCEEDED.inc(source=source, limit=limits.exceeded(usage))
+                metrics.record_usage(source, usage, messages)
+                logger.warning(f"{source} agent for {name} stopped: {e}")
+                raise
+            except UnexpectedModelBehavior:
+                # Output validation gave up after its retries
+                metrics.record_usage(source, usage, messages)
+                raise
+        metrics.record_run(source, result)
+        if budget.exhausted:
+            metrics.BUDGET_EXCEEDED.inc(source=source, limit="tool_calls")
+            logger.warning(
+                f"{source} agent for {name} ran out of tool calls "
+                f"({limits.tool_calls}), returning a partial profile"
+            )
+        else:
+            run_budgets.record(source, result)
+        return result.output
+
+
+async def fetch_profile(source: str, name: str, refresh: bool = False):
+    # A refresh scrapes every page again instead of reusing recently stored ones
+    bypass_store_reuse.set(refresh)
+    zone = zone_limiters[source]
     try:
-        linkedin_prompt = (
-            f"Your task is to find the LinkedIn profile for the company '{name}' and extract specific structured data.\n\n"
-            "Use the `web_data_linkedin_company_profile` tool if available to extract the following fields:\n"
-            "- Company name\n"
-            "- Company description (short summary of what the company does)\n"
-            "- Number of employees (as listed on the LinkedIn profile)\n"
-            "- Linkedin company profile url\n"
-            "- Headquarters address\n"
-            "- Year the company was founded (if available)\n"
-            "- Industry or sector (e.g., 'Software', 'Healthcare')\n"
-            "- Company website\n"
-            "If the structured LinkedIn tool is unavailable or insufficient, use the following tools in order:\n"
-            "1. `scraping_browser_navigate` — to visit the LinkedIn company page\n"
-            "2. `scraping_browser_get_text` — to extract visible page text\n"
-            "3. `scraping_browser_links` and `scraping_browser_click` — to navigate if needed\n\n"
-            "Return ONLY a JSON object with the following keys:\n"
-            "{\n"
-            '  "company_name": str,\n'
-            '  "description": str,\n'
-            '  "number_of_employees": str,\n'
-            '  "linkedin_url": str,\n'
-            '  "headquarters": str,\n'
-            '  "founded": str or null,\n'
-            '  "industry": str,\n'
-            '  "website": str,\n'
-            "}\n\n"
-            "Do not include raw HTML, markdown, explanations, or other fields. "
-            "If a field is missing, use null for that field. If the company cannot be found at all, return null."
+        trial = zone.check()
+    except CircuitOpenError:
+        metrics.SOURCE_OUTCOMES.inc(source=source, outcome="skipped")
+        raise
+    started = time.perf_counter()
+    admitted = None
+    outcome = "failure"
+    tool_errors = []
+    current_tool_errors.set(tool_errors)
+    try:
+        async with asyncio.timeout(SOURCE_TIMEOUTS[source]):
+            async with zone.slot():
+                # Time spent waiting for a slot is not the zone's latency
+                admitted = time.perf_counter()
+                output = await run_source(source, name)
+        outcome = "success"
+        zone.record_success(
+            time.perf_counter() - admitted, ZONE_TARGET_LATENCIES[source]
         )
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        metrics.TIMEOUTS.inc(stage="source")
+        if admitted is None:
+            zone.record_abandoned(trial)
+        else:
+            zone.record_failure()
+        raise
+    except (NoServerAvailableError, UsageLimitExceeded, asyncio.CancelledError):
+        # Not the zone's fault: no MCP server, a runaway agent, or a caller leaving
+        zone.record_abandoned(trial)
+        raise
+    except (McpError, GatewayError, OSError):
+        # MCP protocol, gateway and connection errors
+        zone.record_failure()
+        raise
+    except Exception:
+        # Model and validation failures only count when the scrapes failed too
+        if tool_errors:
+            zone.record_failure()
+        else:
+            zone.record_abandoned(trial)
+        raise
+    finally:
+        metrics.AGENT_RUN_DURATION.observe(
+            time.perf_counter() - started, source=source, outcome=outcome
+        )
+        metrics.SOURCE_OUTCOMES.inc(source=source, outcome=outcome)
+    if source == "linkedin":
+        entity_index.record(name, output)
+    await profile_cache.aset(
+        f"{source}:{company_key(name)}",
+        output.model_dump(),
+        ttl=PROFILE_CACHE_TTLS[source],
+    )
+    return output
+
+
+# Agents without MCP tools that extract profiles from stored scrapes
+extract_agents = {
+    source: create_extract_agent(model, output_type, REQUEST_TIMEOUT)
+    for source, (_, output_type, _) in SOURCES.items()
+}
+
 
-        glassdoor_prompt = (
-            f"Your task is to find the Glassdoor profile for the company '{name}' and extract specific structured data.\n\n"
-            "Extract the following fields:\n"
-            "- Overall company rating (float, out of 5)\n"
-            "- Total number of employee reviews\n"
-            "- A short summary of the top 5 pros and cons from employee reviews posted in 2025 or 2024 only\n\n"
-            "Use the following tools in order:\n"
-            "1. `scraping_browser_navigate` — to go to the Glassdoor company page\n"
-            "2. `scraping_browser_get_text` — to extract visible content\n"
-            "3. `scraping_browser_links` and `scraping_browser_click` — to find and open the review section if necessary\n\n"
-            "Return ONLY a JSON object with the following keys:\n"
-            "{\n"
-            '  "rating": float,\n'
-            '  "num_reviews": int,\n'
-            '  "review_summary": str\n'
-            "}\n\n"
-            "Only use reviews from 2025 or 2024. Do not include older reviews.\n"
-            "Do not include HTML, markdown, or explanations"
-            "If a field is missing, use null for that field. If the company cannot be found at all, return null."
+async def reextract_source(source: str, name: str):
+    output = await reextract_profile(
+        extract_agents[source],
+        scrape_store,
+        source,
+        name,
+        company_key(name),
+        TOOL_OUTPUT_MAX_CHARS,
+    )
+    if output is not None:
+        await profile_cache.aset(
+            f"{source}:{company_key(name)}",
+            output.model_dump(),
+            ttl=PROFILE_CACHE_TTLS[source],
         )
+        # The cached summary was built from the old profile
+        await result_cache.adelete(company_key(name))
+    return output
 
-        crunchbase_prompt = (
-            f"Search for the Crunchbase profile of the company '{name}'. "
-            "Once you find the correct page, extract the following information:\n"
-            "- Year founded (as a string or null)\n"
-            "- Latest funding round name\n"
-            "- Funding round date\n"
-            "- Funding amount\n"
-            "- List of known investors (as strings)\n"
-            "- Key people (e.g., founders, CEOs, etc)\n\n"
-            "Use the following tools in order:\n"
-            "1. `scraping_browser_navigate`\n"
-            "2. `scraping_browser_get_text`\n"
-            "3. `scraping_browser_links` and `scraping_browser_click`\n\n"
-            "Return ONLY a JSON object with the following keys:\n"
-            "{\n"
-            '  "founded": str or null,\n'
-            '  "funding_round": str or null,\n'
-            '  "funding_date": str or null,\n'
-            '  "funding_amount": str or null,\n'
-            '  "investors": list[str] or null,\n'
-            '  "key_people": list[str] or null\n'
-            "}\n\n"
-            "Do not include HTML, markdown, or explanations"
-            "If a field is missing, use null for that field. If the company cannot be found at all, return null."
+
+async def iter_profiles(
+    name: str, refresh: bool = False, stragglers: Optional[set] = None
+):
+    # Yields (source, profile, cached) as soon as each source is available; sources
+    # dropped at the good-enough cutoff are added to `stragglers`
+    cache_key = company_key(name)
+    pending = {}
+    for source, (_, output_type, _) in SOURCES.items():
+        cached, stale = (
+            (None, False)
+            if refresh
+            else await profile_cache.aget_stale(f"{source}:{cache_key}")
+        )
+        if cached is not None:
+            metrics.SOURCE_OUTCOMES.inc(
+                source=source, outcome="stale" if stale else "cached"
+            )
+            if stale:
+                await refresher.revalidate(cache_key, name)
+            yield source, output_type.model_validate(cached), True
+            continue
+        fetch = functools.partial(fetch_profile, source, name, refresh)
+        limits = batch_limits.get()
+        if limits is not None:
+            fetch = functools.partial(limits.fetch, source, fetch)
+        task = asyncio.ensure_future(
+            source_flight.do(flight_key(f"{source}:{cache_key}", refresh), fetch)
         )
+        pending[task] = source
 
-        news_prompt = (
-            f"Search for news about the company '{name}' from 2023, 2024, and 2025.\n\n"
-            "Extract the following if available:\n"
-            "- Layoffs: Dates and brief summaries of any layoff announcements.\n"
-            "- Scandals: Brief, neutral headlines about controversies or investigations.\n"
-            "- Achievements: Public product launches, funding milestones, acquisitions, or major hires.\n\n"
-            "Return a structured JSON object with keys:\n"
-            "{\n"
-            "  'layoffs': list[str],\n"
-            "  'scandals': list[str],\n"
-            "  'achievements': list[str]\n"
-            "}\n\n"
-            "If no news is found in a category, return an empty list. Do not include HTML, explanations, or irrelevant information."
+    logger.info(f"Fetching {sorted(pending.values())} for {name}")
+    loop = asyncio.get_running_loop()
+    hard_deadline = loop.time() + DATA_FETCH_TIMEOUT
+    good_enough = loop.time() + GOOD_ENOUGH_TIMEOUT
+    available = len(SOURCES) - len(pending)
+    try:
+        while pending:
+            enough = available >= MIN_SOURCES_FOR_SUMMARY
+            until = good_enough if enough else hard_deadline
+            if loop.time() >= until:
+                if not enough:
+                    metrics.TIMEOUTS.inc(stage="fetch")
+                    raise asyncio.TimeoutError
+                metrics.TIMEOUTS.inc(stage="good_enough")
+                logger.info(
+                    f"Summarizing {name} without {sorted(pending.values())} "
+                    f"after {GOOD_ENOUGH_TIMEOUT}s"
+                )
+                for source in pending.values():
+                    metrics.SOURCE_OUTCOMES.inc(source=source, outcome="straggler")
+                    if stragglers is not None:
+                        stragglers.add(source)
+                    yield source, None, False
+                break
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=until - loop.time(),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                source = pending.pop(task)
+                if task.exception() is not None:
+                    logger.warning(
+                        f"{source} agent failed for {name}: {task.exception()!r}"
+                    )
+                    yield source, None, False
+                else:
+                    available += 1
+                    yield source, task.result(), False
+    finally:
+        # Only cancels our wait; the shared fetch keeps running for other callers
+        for task in pending:
+            task.cancel()
+        if pending and STRAGGLER_POLICY == "cancel":
+            await asyncio.gather(*pending, return_exceptions=True)
+            for source in pending.values():
+                source_flight.abandon(flight_key(f"{source}:{cache_key}", refresh))
+
+
+async def summarize_profiles(
+    name: str,
+    profiles: dict,
+    feed: Optional[Broadcast] = None,
+    ttl: Optional[int] = None,
+) -> CompanyResponse:
+    # With a feed the summary is streamed to it as "summary" deltas
+    linkedin, glassdoor, crunchbase, news = (profiles[source] for source in SOURCES)
+
+    if all(x is None for x in [linkedin, glassdoor, crunchbase, news]):
+        return CompanyResponse(
+            summary="Unable to gather any information about this company.", rating=1
         )
 
-        results = await asyncio.wait_for(
-            asyncio.gather(
-                linkedin_agent.run(linkedin_prompt),
-                glassdoor_agent.run(glassdoor_prompt),
-                crunchbase_agent.run(crunchbase_prompt),
-                news_agent.run(news_prompt),
-                return_exceptions=True,
-            ),
-            timeout=DATA_FETCH_TIMEOUT,
+    try:
+        async with asyncio.timeout(SUMMARIZATION_TIMEOUT):
+            if feed is None:
+                summary_result = await summarize_company(
+                    name, linkedin, glassdoor, crunchbase, news
+                )
+            else:
+                async for item in summarize_company_stream(
+                    name, linkedin, glassdoor, crunchbase, news
+                ):
+                    if isinstance(item, str):
+                        feed.publish(type="summary", delta=item)
+                    else:
+                        summary_result = item
+    except asyncio.TimeoutError:
+        metrics.TIMEOUTS.inc(stage="summary")
+        raise
+
+    response = CompanyResponse(
+        summary=summary_result.summary, rating=summary_result.rating
+    )
+    await result_cache.aset(
+        company_key(name), response.model_dump(exclude={"stale"}), ttl=ttl
+    )
+    return response
+
+
+async def analysis_from_peer(name: str, key: str) -> Optional[CompanyResponse]:
+    # Another worker holds the claim: wait until it lets go and use the result it
+    # cached (None if it failed or the result cache is not shared)
+    cache_key = company_key(name)
+    before = await result_cache.apeek(cache_key)
+    logger.info(f"Waiting for another worker analyzing {name}")
+    while await asyncio.to_thread(flight_claims.held, key):
+        await asyncio.sleep(FLIGHT_POLL_INTERVAL)
+    after = await result_cache.apeek(cache_key)
+    if after is None or after == before:
+        return None
+    return CompanyResponse(**after[1])
+
+
+async def analyze(
+    name: str, feed: Broadcast, refresh: bool = False, stream: bool = False
+) -> CompanyResponse:
+    if flight_claims is None:
+        return await analyze_here(name, feed, refresh, stream)
+    key = flight_key(company_key(name), refresh)
+    if not await asyncio.to_thread(flight_claims.claim, key):
+        response = await analysis_from_peer(name, key)
+        if response is not None:
+            return response
+        await asyncio.to_thread(flight_claims.claim, key)
+    keeper = asyncio.create_task(flight_claims.keep(key))
+    try:
+        return await analyze_here(name, feed, refresh, stream)
+    finally:
+        keeper.cancel()
+        await asyncio.to_thread(flight_claims.release, key)
+
+
+async def analyze_here(
+    name: str, feed: Broadcast, refresh: bool = False, stream: bool = False
+) -> CompanyResponse:
+    profiles = {}
+    stragglers = set()
+    async for source, profile, cached in iter_profiles(name, refresh, stragglers):
+        profiles[source] = profile
+        feed.publish(
+            type="profile",
+            source=source,
+            cached=cached,
+            data=profile.model_dump() if profile is not None else None,
+        )
+    limits = batch_limits.get()
+    async with limits.summary if limits else contextlib.nullcontext():
+        return await summarize_profiles(
+            name,
+            profiles,
+            feed if stream else None,
+            ttl=PARTIAL_RESULT_CACHE_TTL if stragglers else None,
         )
 
-        linkedin, glassdoor, crunchbase, news = [
-            r.output if not isinstance(r, Exception) else None for r in results
-        ]
 
-        if all(x is None for x in [linkedin, glassdoor, crunchbase, news]):
-            return CompanyResponse(
-                summary="Unable to gather any information about this company.", rating=1
+# Events of each in-flight analysis, by company flight key
+analysis_feeds: dict[str, Broadcast] = {}
+
+
+def start_analysis(
+    name: str, refresh: bool = False, stream: bool = False
+) -> tuple[asyncio.Task, Broadcast]:
+    # Joins the in-flight analysis of the company or starts one; `stream` streams
+    # the summary of a new one to its feed
+    key = flight_key(company_key(name), refresh)
+    feed = analysis_feeds.get(key) or Broadcast()
+    task, started = company_flight.start(
+        key, functools.partial(analyze, name, feed, refresh, stream)
+    )
+    if started:
+        analysis_feeds[key] = feed
+
+        def finished(_):
+            feed.close()
+            if analysis_feeds.get(key) is feed:
+                del analysis_feeds[key]
+
+        task.add_done_callback(finished)
+    return task, feed
+
+
+async def run_job(job: Job):
+    cache_key = company_key(job.name)
+    watchlist.record(cache_key, job.name)
+    if not job.refresh:
+        cached = await cached_result(cache_key, job.name)
+        if cached is not None:
+            job.result = cached
+            metrics.REQUEST_DURATION.observe(
+                0, endpoint="jobs", cache="stale" if cached["stale"] else "hit"
+            )
+            return
+
+    task, feed = start_analysis(job.name, job.refresh)
+    async for item in feed.subscribe():
+        if item["type"] == "profile":
+            job.profiles[item["source"]] = item["data"]
+            await job_queue.save(job)
+    response = await company_flight.wait(flight_key(cache_key, job.refresh), task)
+    job.result = response.model_dump()
+    metrics.REQUEST_DURATION.observe(
+        time.time() - job.started_at, endpoint="jobs", cache="miss"
+    )
+
+
+# Async jobs: a bounded queue drained by a fixed number of workers
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "32"))
+JOB_TTL = int(os.getenv("JOB_TTL", str(60 * 60)))
+
+job_queue = JobQueue(
+    run_job, JOB_WORKERS, JOB_QUEUE_SIZE, JOB_TTL, JobStore(STATE_DB_PATH)
+)
+
+# Background refresh of watched companies (WATCHLIST plus the most requested ones)
+REFRESH_INTERVAL = int(os.getenv("REFRESH_INTERVAL", "300"))
+REFRESH_AHEAD = float(os.getenv("REFRESH_AHEAD", "0.2"))
+REFRESH_CONCURRENCY = int(os.getenv("REFRESH_CONCURRENCY", "1"))
+REFRESH_RATE = float(os.getenv("REFRESH_RATE", "6"))
+REFRESH_RETRY_AFTER = int(os.getenv("REFRESH_RETRY_AFTER", str(60 * 60)))
+REFRESH_QUEUE_SIZE = int(os.getenv("REFRESH_QUEUE_SIZE", "100"))
+REFRESH_MAX_UTILIZATION = float(os.getenv("REFRESH_MAX_UTILIZATION", "0.5"))
+WATCHLIST = [n.strip() for n in os.getenv("WATCHLIST", "").split(",") if n.strip()]
+WATCHLIST_SIZE = int(os.getenv("WATCHLIST_SIZE", "50"))
+WATCHLIST_MIN_REQUESTS = float(os.getenv("WATCHLIST_MIN_REQUESTS", "2"))
+WATCHLIST_HALF_LIFE = int(os.getenv("WATCHLIST_HALF_LIFE", str(7 * 24 * 60 * 60)))
+# Only the worker holding this lock runs the refresher (empty: every worker does)
+REFRESH_LOCK_PATH = os.getenv("REFRESH_LOCK_PATH", "refresh.lock")
+
+
+async def cached_result(cache_key: str, name: str):
+    # Cached result, stale ones included; a stale hit queues a background refresh
+    cached, stale = await result_cache.aget_stale(cache_key)
+    if cached is None:
+        return None
+    logger.info(f"{'Stale cache' if stale else 'Cache'} hit for {name}")
+    if stale:
+        await refresher.revalidate(cache_key, name)
+    return {**cached, "stale": stale}
+
+
+async def due_sources(cache_key: str) -> list[str]:
+    # Sources whose profile is missing or within REFRESH_AHEAD of its TTL
+    now = time.time()
+    due = []
+    for source in SOURCES:
+        entry = await profile_cache.apeek(f"{source}:{cache_key}")
+        ahead = REFRESH_AHEAD * PROFILE_CACHE_TTLS[source]
+        if entry is None or entry[0] - now <= ahead:
+            due.append(source)
+    return due
+
+
+async def refresh_due(name: str) -> bool:
+    cache_key = company_key(name)
+    entry = await result_cache.apeek(cache_key)
+    if entry is None or entry[0] - time.time() <= REFRESH_AHEAD * RESULT_CACHE_TTL:
+        return True
+    return bool(await due_sources(cache_key))
+
+
+def mcp_busy() -> bool:
+    # Interactive traffic keeps the MCP servers busy; background refreshes wait
+    return any(
+        pool.stats()["utilization"] >= REFRESH_MAX_UTILIZATION
+        for pool, _, _ in SOURCES.values()
+    )
+
+
+async def refresh_company(name: str):
+    cache_key = company_key(name)
+    due = await due_sources(cache_key)
+    results = await asyncio.gather(
+        *(
+            source_flight.do(
+                flight_key(f"{source}:{cache_key}", True),
+                functools.partial(fetch_profile, source, name, True),
             )
+            for source in due
+        ),
+        return_exceptions=True,
+    )
+    for source, result in zip(due, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"Background {source} refresh for {name}: {result!r}")
+    fetched = [r for r in results if not isinstance(r, BaseException)]
+    if not fetched and not await refresh_due(name):
+        return
 
-        summary_result = await asyncio.wait_for(
-            summarize_company(name, linkedin, glassdoor, crunchbase, news),
-            timeout=SUMMARIZATION_TIMEOUT,
+    # A profile that could not be refreshed is still better than none
+    profiles = {}
+    for source, (_, output_type, _) in SOURCES.items():
+        entry = await profile_cache.apeek(f"{source}:{cache_key}")
+        profiles[source] = (
+            output_type.model_validate(entry[1]) if entry is not None else None
         )
+    await summarize_profiles(name, profiles)
+    logger.info(f"Refreshed {name} in the background ({len(fetched)}/{len(due)})")
 
-        return CompanyResponse(
-            summary=summary_result.summary, rating=summary_result.rating
+
+watchlist = Watchlist(
+    [(company_key(name), name) for name in WATCHLIST],
+    WATCHLIST_SIZE,
+    WATCHLIST_MIN_REQUESTS,
+    WATCHLIST_HALF_LIFE,
+)
+refresher = Refresher(
+    refresh_company,
+    refresh_due,
+    mcp_busy,
+    watchlist,
+    REFRESH_INTERVAL,
+    REFRESH_CONCURRENCY,
+    REFRESH_RATE,
+    REFRESH_RETRY_AFTER,
+    REFRESH_QUEUE_SIZE,
+    RefreshRequests(STATE_DB_PATH) if REFRESH_ENABLED else None,
+)
+
+
+@app.get("/watchlist")
+async def get_watchlist(x_api_key: str = Header(...)):
+    check_api_key(x_api_key)
+    return watchlist.stats()
+
+
+@app.post("/watchlist")
+async def pin_company(
+    name: str = Query(..., description="Company name"),
+    x_api_key: str = Header(...),
+):
+    # Keep a company warm regardless of how often it is requested
+    check_api_key(x_api_key)
+    watchlist.pin(company_key(name), name)
+    return watchlist.stats()
+
+
+@app.delete("/watchlist")
+async def unpin_company(
+    name: str = Query(..., description="Company name"),
+    x_api_key: str = Header(...),
+):
+    check_api_key(x_api_key)
+    if not watchlist.unpin(company_key(name)):
+        raise HTTPException(status_code=404, detail="Company is not pinned")
+    return watchlist.stats()
+
+
+@app.post("/reextract")
+async def reextract_company(
+    name: str = Query(..., description="Company name"),
+    x_api_key: str = Header(...),
+):
+    # Rebuild a company's profiles from stored scrapes (e.g. after a schema change)
+    check_api_key(x_api_key)
+    if scrape_store is None:
+        raise HTTPException(status_code=400, detail="Scrape store is disabled")
+    outputs = await asyncio.gather(
+        *(reextract_source(source, name) for source in SOURCES),
+        return_exceptions=True,
+    )
+    profiles = {}
+    for source, output in zip(SOURCES, outputs):
+        if isinstance(output, Exception):
+            logger.error(f"Re-extraction of {source} for {name} failed: {output}")
+            profiles[source] = None
+        else:
+            profiles[source] = output.model_dump() if output is not None else None
+    return {"name": name, "profiles": profiles}
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(
+    name: str = Query(..., description="Company name"),
+    refresh: bool = Query(False, description="Bypass the cache and re-analyze"),
+    x_api_key: str = Header(...),
+):
+    check_api_key(x_api_key)
+    try:
+        job = await job_queue.submit(name, refresh)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many pending analyses, try again later.",
+            headers={"Retry-After": str(e.retry_after)},
         )
+    return {"job_id": job.id, "status": job.status}
+
 
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, x_api_key: str = Header(...)):
+    check_api_key(x_api_key)
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/analyze_company", response_model=CompanyResponse)
+async def analyze_company(
+    name: str = Query(..., description="Company name"),
+    refresh: bool = Query(False, description="Bypass the cache and re-analyze"),
+    x_api_key: str = Header(...),
+):
+    logger.info(f"Analyzing company: {name}")
+    check_api_key(x_api_key)
+
+    started = time.perf_counter()
+    cache_key = company_key(name)
+    watchlist.record(cache_key, name)
+    if not refresh:
+        cached = await cached_result(cache_key, name)
+        if cached is not None:
+            metrics.REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                endpoint="analyze_company",
+                cache="stale" if cached["stale"] else "hit",
+            )
+            return CompanyResponse(**cached)
+
+    try:
+        task, _ = start_analysis(name, refresh)
+        response = await company_flight.wait(flight_key(cache_key, refresh), task)
+        metrics.REQUEST_DURATION.observe(
+            time.perf_counter() - started, endpoint="analyze_company", cache="miss"
+        )
+        return response
     except asyncio.TimeoutError:
         raise HTTPException(status_code=504, detail="Timeout during summarization.")
     except Exception as e:
         logger.error(f"Unhandled error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def stream_analysis(name: str, refresh: bool = False):
+    def event(**data) -> str:
+        return json.dumps(data) + "\n"
+
+    started = time.perf_counter()
+    cache_key = company_key(name)
+    watchlist.record(cache_key, name)
+    if not refresh:
+        cached = await cached_result(cache_key, name)
+        if cached is not None:
+            metrics.REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                endpoint="analyze_company_stream",
+                cache="stale" if cached["stale"] else "hit",
+            )
+            yield event(type="result", cached=True, **cached)
+            return
+
+    try:
+        # Shares the analysis with concurrent requests for the company; joining
+        # late replays the events so far
+        task, feed = start_analysis(name, refresh, stream=True)
+        async for item in feed.subscribe():
+            yield event(**item)
+        response = await company_flight.wait(flight_key(cache_key, refresh), task)
+        metrics.REQUEST_DURATION.observe(
+            time.perf_counter() - started,
+            endpoint="analyze_company_stream",
+            cache="miss",
+        )
+        yield event(type="result", cached=False, **response.model_dump())
+
+    except asyncio.TimeoutError:
+        yield event(type="error", status=504, detail="Timeout during summarization.")
+    except Exception as e:
+        logger.error(f"Unhandled error: {e}", exc_info=True)
+        yield event(type="error", status=500, detail=str(e))
+
+
+@app.get("/analyze_company/stream")
+async def analyze_company_stream(
+    name: str = Query(..., description="Company name"),
+    refresh: bool = Query(False, description="Bypass the cache and re-analyze"),
+    x_api_key: str = Header(...),
+):
+    # NDJSON stream: one "profile" event per source, "summary" deltas, then "result"
+    logger.info(f"Streaming analysis for company: {name}")
+    check_api_key(x_api_key)
+    return StreamingResponse(
+        stream_analysis(name, refresh), media_type="application/x-ndjson"
+    )
+
+
+# Batch analysis: per-source concurrency limits shared by the whole batch
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "500"))
+BATCH_SOURCE_CONCURRENCY = {
+    source: int(
+        os.getenv(f"{source.upper()}_BATCH_CONCURRENCY", str(len(pool.members)))
+    )
+    for source, (pool, _, _) in SOURCES.items()
+}
+BATCH_SUMMARY_CONCURRENCY = int(os.getenv("BATCH_SUMMARY_CONCURRENCY", "4"))
+
+
+class BatchLimits:
+    """Concurrency limits of one batch, applied to the analyses the batch starts."""
+
+    def __init__(self):
+        self.sources = {
+            source: asyncio.Semaphore(limit)
+            for source, limit in BATCH_SOURCE_CONCURRENCY.items()
+        }
+        self.summary = asyncio.Semaphore(BATCH_SUMMARY_CONCURRENCY)
+        self.agent_runs = 0
+
+    async def fetch(self, source: str, fn):
+        # Only runs for fetches the batch actually starts, not joined ones
+        async with self.sources[source]:
+            self.agent_runs += 1
+            return await fn()
+
+
+# Set while a batch starts an analysis; its tasks inherit the limits
+batch_limits: contextvars.ContextVar[Optional[BatchLimits]] = contextvars.ContextVar(
+    "batch_limits", default=None
+)
+
+
+async def stream_batch(names: list[str], refresh: bool = False):
+    def event(**data) -> str:
+        return json.dumps(data) + "\n"
+
+    started = time.perf_counter()
+    companies = {}
+    for name in names:
+        companies.setdefault(company_key(name), name)
+    limits = BatchLimits()
+    counts = {"cached_profiles": 0, "cached_results": 0}
+
+    async def analyze_one(cache_key: str, name: str) -> dict:
+        # Same path as single lookups: stale hits are served and revalidated, and
+        # companies already being analyzed are joined instead of run again
+        if not refresh:
+            cached = await cached_result(cache_key, name)
+            if cached is not None:
+                counts["cached_results"] += 1
+                return {"name": name, "cached": True, **cached}
+
+        batch_limits.set(limits)
+        task, feed = start_analysis(name, refresh)
+        async for item in feed.subscribe():
+            if item["type"] == "profile" and item["cached"]:
+                counts["cached_profiles"] += 1
+        response = await company_flight.wait(flight_key(cache_key, refresh), task)
+        return {"name": name, "cached": False, **response.model_dump()}
+
+    async def run_one(cache_key: str, name: str) -> dict:
+        try:
+            return await analyze_one(cache_key, name)
+        except Exception as e:
+            logger.error(f"Batch analysis failed for {name}: {e}", exc_info=True)
+            return {"name": name, "error": str(e) or type(e).__name__}
+
+    tasks = [
+        asyncio.ensure_future(run_one(cache_key, name))
+        for cache_key, name in companies.items()
+    ]
+    failed = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            failed += "error" in result
+            yield event(type="company", **result)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    elapsed = time.perf_counter() - started
+    metrics.REQUEST_DURATION.observe(elapsed, endpoint="analyze_batch", cache="n/a")
+    yield event(
+        type="done",
+        companies=len(companies),
+        duplicates=len(names) - len(companies),
+        failed=failed,
+        elapsed=round(elapsed, 3),
+        companies_per_minute=round(len(companies) * 60 / elapsed, 2),
+        agent_runs=limits.agent_runs,
+        **counts,
+    )
+
+
+@app.post("/analyze_batch")
+async def analyze_batch(request: BatchRequest, x_api_key: str = Header(...)):
+    # NDJSON stream: one "company" event per company as it completes, then "done"
+    check_api_key(x_api_key)
+    if len(request.names) > BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400, detail=f"At most {BATCH_MAX_SIZE} companies per batch"
+        )
+    logger.info(f"Analyzing batch of {len(request.names)} companies")
+    return StreamingResponse(
+        stream_batch(request.names, request.refresh),
+        media_type="application/x-ndjson",
+    )
+
+
+# Metrics: gauges read live state at scrape time
+def pool_gauges(field: str):
+    return lambda: [
+        ({"source": source}, pool.stats()[field])
+        for source, (pool, _, _) in SOURCES.items()
+    ]
+
+
+def zone_gauges(field: str):
+    return lambda: [
+        ({"zone": limiter.zone}, limiter.stats()[field])
+        for limiter in set(zone_limiters.values())
+    ]
+
+
+def cache_lookups():
+    for cache_name, cache in [("result", result_cache), ("profile", profile_cache)]:
+        yield {"cache": cache_name, "result": "hit"}, cache.hits
+        yield {"cache": cache_name, "result": "stale"}, cache.stale_hits
+        yield {"cache": cache_name, "result": "miss"}, cache.misses
+
+
+def job_states():
+    stats = job_queue.stats()
+    return [({"state": state}, stats[state]) for state in ["queued", "running"]]
+
+
+metrics.registry.gauge(
+    "reputato_mcp_pool_in_flight",
+    "Agent runs in flight per MCP server pool",
+    ["source"],
+    pool_gauges("in_flight"),
+)
+metrics.registry.gauge(
+    "reputato_mcp_pool_utilization",
+    "Fraction of MCP server processes with at least one run in flight",
+    ["source"],
+    pool_gauges("utilization"),
+)
+metrics.registry.gauge(
+    "reputato_mcp_servers_ready",
+    "MCP server processes passing health checks, per source",
+    ["source"],
+    lambda: [
+        ({"source": source}, pool.health()["ready"])
+        for source, (pool, _, _) in SOURCES.items()
+    ],
+)
+metrics.registry.gauge(
+    "reputato_mcp_server_restarts",
+    "MCP server restarts since start, per source",
+    ["source"],
+    lambda: [
+        ({"source": source}, sum(m.restarts for m in pool.members))
+        for source, (pool, _, _) in SOURCES.items()
+    ],
+)
+metrics.registry.gauge(
+    "reputato_zone_concurrency_limit",
+    "Adaptive concurrency limit per Bright Data zone",
+    ["zone"],
+    zone_gauges("limit"),
+)
+metrics.registry.gauge(
+    "reputato_zone_in_flight",
+    "Agent runs in flight per Bright Data zone",
+    ["zone"],
+    zone_gauges("in_flight"),
+)
+metrics.registry.gauge(
+    "reputato_zone_waiting",
+    "Agent runs waiting for a concurrency slot per Bright Data zone",
+    ["zone"],
+    zone_gauges("waiting"),
+)
+metrics.registry.gauge(
+    "reputato_zone_circuit_state",
+    "Circuit breaker state per Bright Data zone (0 closed, 1 half-open, 2 open)",
+    ["zone"],
+    lambda: [
+        ({"zone": limiter.zone}, BREAKER_STATES[limiter.state])
+        for limiter in set(zone_limiters.values())
+    ],
+)
+metrics.registry.gauge(
+    "reputato_zone_circuit_rejections",
+    "Agent runs skipped because the zone's circuit was open, since start",
+    ["zone"],
+    zone_gauges("rejected"),
+)
+metrics.registry.gauge(
+    "reputato_agent_budget",
+    "Current per-run cap on tool calls, model requests and tokens per source",
+    ["source", "limit"],
+    lambda: [
+        ({"source": source, "limit": limit}, value)
+        for source in SOURCES
+        for limit, value in vars(run_budgets.limits(source)).items()
+        if value is not None
+    ],
+)
+metrics.registry.gauge(
+    "reputato_cache_lookups",
+    "Cache lookups since start, by cache and result",
+    ["cache", "result"],
+    cache_lookups,
+)
+metrics.registry.gauge("reputato_jobs", "Async jobs by state", ["state"], job_states)
+metrics.registry.gauge(
+    "reputato_background_refreshes",
+    "Background refreshes since start by outcome, plus currently running/queued",
+    ["state"],
+    lambda: [
+        ({"state": state}, refresher.stats()[state])
+        for state in ["running", "queued", "refreshed", "failed", "deferred", "dropped"]
+    ],
+)
+metrics.registry.gauge(
+    "reputato_linkedin_fast_path_runs",
+    "LinkedIn lookups by path taken since start",
+    ["path"],
+    lambda: [({"path": path}, count) for path, count in linkedin_paths.items()],
+)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    return PlainTextResponse(
+        metrics.registry.render(), media_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,333 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+import json
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Optional
+
+from pydantic_ai import Agent
+from pydantic_ai.exceptions import ModelRetry
+from pydantic_ai.mcp import MCPServer, MCPServerStdio
+
+from app.budgets import check_tool_budget
+from app.gateway import GatewayMCPServer
+from app.limiter import record_tool_error
+from app.metrics import MCP_TOOL_DURATION
+from app.reducer import PAGE_TOOLS, reduce_tool_output
+from app.scrape_store import (
+    STORED_TOOLS,
+    ScrapeStore,
+    bypass_store_reuse,
+    current_company,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SourceMCPServer(MCPServerStdio):
+    """MCPServerStdio that knows which source it serves and times its tool calls.
+
+    With `reduce_output`, whole-page scraping results are trimmed down to the lines
+    relevant to the source before the agent sees them. With a `store`, raw page
+    output is kept for re-extraction, and a call repeated within `reuse_ttl`
+    seconds is answered from the store instead of scraping again.
+    """
+
+    source: str = ""
+    reduce_output: bool = False
+    max_output_chars: int = 12000
+    store: Optional[ScrapeStore] = None
+    reuse_ttl: float = 0
+    browser_url: Optional[str] = field(default=None, init=False, repr=False)
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any]) -> Any:
+        started = time.perf_counter()
+        outcome = "success"
+        try:
+            exhausted = check_tool_budget()
+            if exhausted is not None:
+                outcome = "budget"
+                return exhausted
+            url = self._track_url(tool_name, arguments)
+            keep = self.store is not None and tool_name in STORED_TOOLS and url
+            result = None
+            if keep and self.reuse_ttl > 0 and not bypass_store_reuse.get():
+                result = await asyncio.to_thread(
+                    self.store.recent,
+                    self.source,
+                    tool_name,
+                    url,
+                    arguments,
+                    self.reuse_ttl,
+                )
+                if result is not None:
+                    outcome = "reused"
+            if result is None:
+                result = await super().call_tool(tool_name, arguments)
+                if keep:
+                    company, name = current_company.get() or (None, None)
+                    await asyncio.to_thread(
+                        self.store.put,
+                        self.source,
+                        tool_name,
+                        url,
+                        arguments,
+                        result if isinstance(result, str) else json.dumps(result),
+                        company=company,
+                        name=name,
+                    )
+            if (
+                self.reduce_output
+                and tool_name in PAGE_TOOLS
+                and isinstance(result, str)
+            ):
+                result = reduce_tool_output(
+                    self.source, tool_name, result, self.max_output_chars
+                )
+            return result
+        except Exception as e:
+            outcome = "error"
+            if isinstance(e, ModelRetry):
+                record_tool_error(e.message)
+            raise
+        finally:
+            MCP_TOOL_DURATION.observe(
+                time.perf_counter() - started,
+                source=self.source,
+                tool=tool_name,
+                outcome=outcome,
+            )
+
+    def _track_url(self, tool_name: str, arguments: dict[str, Any]) -> Optional[str]:
+        # The browser tools act on whatever page was navigated to last
+        if tool_name == "scraping_browser_navigate":
+            self.browser_url = arguments.get("url")
+        elif tool_name.startswith("scraping_browser_") and tool_name not in (
+            "scraping_browser_get_text",
+            "scraping_browser_links",
+        ):
+            # Clicks and the like change the page, so its text is no longer
+            # just a function of the URL
+            self.browser_url = None
+        if tool_name == "scraping_browser_get_text":
+            return self.browser_url
+        return arguments.get("url")
+
+
+class PoolMember:
+    def __init__(self, index: int, agent: Agent, server: MCPServer):
+        self.index = index
+        self.agent = agent
+        self.server = server
+        self.in_flight = 0
+        self.runs = 0
+        self.status = "stopped"
+        self.restarts = 0
+        self.probe_failures = 0
+        self.last_error: Optional[str] = None
+        self.last_probe: Optional[float] = None
+        self.ready = asyncio.Event()
+        self.restart = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+
+class NoServerAvailableError(RuntimeError):
+    pass
+
+
+class MCPPool:
+    """A fixed set of MCP server processes for one source, each with its own agent.
+
+    Agent runs are dispatched to the ready member with the fewest runs in flight.
+    Each server is entered and exited by its own owner task (MCP stdio contexts must
+    be closed by the task that opened them), which restarts it when the supervisor
+    finds it dead or wedged.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        members: list[tuple[Agent, MCPServer]],
+        probe_timeout: float = 10,
+        max_probe_failures: int = 2,
+        restart_backoff: float = 5,
+        start_timeout: float = 60,
+    ):
+        if not members:
+            raise ValueError(f"MCP pool for {source} needs at least one server")
+        self.source = source
+        self.members = [
+            PoolMember(i, agent, server) for i, (agent, server) in enumerate(members)
+        ]
+        self.probe_timeout = probe_timeout
+        self.max_probe_failures = max_probe_failures
+        self.restart_backoff = restart_backoff
+        self.start_timeout = start_timeout
+        self._stopping = False
+
+    @property
+    def agents(self) -> list[Agent]:
+        return [member.agent for member in self.members]
+
+    async def start(self, timeout: float) -> None:
+        # Launch every server at once and wait (bounded) until they pass a probe
+        self._stopping = False
+        for member in self.members:
+            member.task = asyncio.create_task(self._run_member(member))
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(m.ready.wait() for m in self.members)), timeout
+            )
+            logger.info(f"Started {len(self.members)} MCP server(s) for {self.source}")
+        except asyncio.TimeoutError:
+            ready = sum(1 for m in self.members if m.ready.is_set())
+            logger.warning(
+                f"Only {ready}/{len(self.members)} MCP server(s) for {self.source} "
+                f"ready after {timeout}s; the rest keep retrying"
+            )
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for member in self.members:
+            member.restart.set()
+        await asyncio.gather(
+            *(m.task for m in self.members if m.task), return_exceptions=True
+        )
+
+    async def check(self) -> None:
+        # Probe every ready server; restart those that fail repeatedly or hang
+        await asyncio.gather(
+            *(self._probe(m) for m in self.members if m.status == "ready")
+        )
+
+    async def _probe(self, member: PoolMember) -> None:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(member.server.list_tools(), self.probe_timeout)
+            member.probe_failures = 0
+            member.last_probe = time.perf_counter() - started
+        except Exception as e:
+            member.probe_failures += 1
+            member.last_error = f"Probe failed: {e!r}"
+            logger.warning(
+                f"MCP server {self.source}#{member.index} probe failed "
+                f"({member.probe_failures}/{self.max_probe_failures}): {e!r}"
+            )
+            if member.probe_failures >= self.max_probe_failures:
+                member.restart.set()
+
+    async def _run_member(self, member: PoolMember) -> None:
+        while not self._stopping:
+            member.status = "starting" if not member.restarts else "restarting"
+            try:
+                async with asyncio.timeout(self.start_timeout):
+                    await member.server.__aenter__()
+            except Exception as e:
+                member.status = "failed"
+                member.last_error = f"Start failed: {e!r}"
+                logger.error(
+                    f"MCP server {self.source}#{member.index} failed to start: {e!r}"
+                )
+                # Close whatever the failed start opened (process, streams)
+                await self._stop_server(member)
+                await asyncio.sleep(self.restart_backoff)
+                member.restarts += 1
+                continue
+
+            try:
+                await asyncio.wait_for(member.server.list_tools(), self.probe_timeout)
+                member.status = "ready"
+                member.probe_failures = 0
+                member.ready.set()
+                await member.restart.wait()
+            except Exception as e:
+                member.last_error = f"Readiness probe failed: {e!r}"
+                logger.error(
+                    f"MCP server {self.source}#{member.index} not ready: {e!r}"
+                )
+            finally:
+                member.ready.clear()
+                member.restart.clear()
+                member.status = "stopping"
+                await self._stop_server(member)
+
+            if not self._stopping:
+                member.restarts += 1
+                member.status = "restarting"
+                logger.warning(f"Restarting MCP server {self.source}#{member.index}")
+                await asyncio.sleep(self.restart_backoff)
+        member.status = "stopped"
+
+    async def _stop_server(self, member: PoolMember) -> None:
+        try:
+            await member.server.__aexit__(None, None, None)
+        except Exception as e:
+            logger.warning(
+                f"Error stopping MCP server {self.source}#{member.index}: {e!r}"
+            )
+
+    def pick(self) -> PoolMember:
+        # The ready member with the fewest runs in flight, without taking it
+        ready = [m for m in self.members if m.status == "ready"]
+        if not ready:
+            raise NoServerAvailableError(f"No MCP server ready for {self.source}")
+        return min(ready, key=lambda m: (m.in_flight, m.runs))
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[PoolMember]:
+        member = self.pick()
+        member.in_flight += 1
+        member.runs += 1
+        try:
+            if isinstance(member.server, GatewayMCPServer):
+                # Keep the whole run on one server process behind the gateway
+                async with member.server.lease():
+                    yield member
+            else:
+                yield member
+        finally:
+            member.in_flight -= 1
+
+    def health(self) -> dict:
+        ready = sum(1 for m in self.members if m.status == "ready")
+        return {
+            "status": (
+                "ok" if ready == len(self.members) else "degraded" if ready else "down"
+            ),
+            "ready": ready,
+            "size": len(self.members),
+            "members": [
+                {
+                    "index": m.index,
+                    "status": m.status,
+                    "restarts": m.restarts,
+                    "last_probe_s": (
+                        round(m.last_probe, 3) if m.last_probe is not None else None
+                    ),
+                    "last_error": m.last_error,
+                }
+                for m in self.members
+            ],
+        }
+
+    def stats(self) -> dict:
+        size = len(self.members)
+        busy = sum(1 for m in self.members if m.in_flight)
+        return {
+            "size": size,
+            "busy": busy,
+            "in_flight": sum(m.in_flight for m in self.members),
+            "utilization": round(busy / size, 4),
+            "members": [
+                {"index": m.index, "in_flight": m.in_flight, "runs": m.runs}
+                for m in self.members
+            ],
+        }
+
+
+async def supervise(pools: list[MCPPool], interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.gather(*(pool.check() for pool in pools), return_exceptions=True)
@@ -0,0 +1,305 @@
+import bisect
+import threading
+from typing import Callable, Iterable, Optional
+
+from pydantic_ai.messages import ModelResponse, RetryPromptPart, ToolCallPart
+
+# Minimal Prometheus text-format metrics, so /metrics works without any extra service
+# or client library.
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple, **extra) -> dict:
+        return {**dict(zip(self.labelnames, key)), **extra}
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        with self._lock:
+            return [
+                (self.name, self._labels(key), value)
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (per-bucket counts, sum, count)
+        self._values: dict[tuple, tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(
+                key, ([0] * len(self.buckets), 0.0, 0)
+            )
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(counts):
+                counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    samples.append(
+                        (
+                            f"{self.name}_bucket",
+                            self._labels(key, le=_format_value(float(bound))),
+                            cumulative,
+                        )
+                    )
+                samples.append(
+                    (f"{self.name}_bucket", self._labels(key, le="+Inf"), count)
+                )
+                samples.append((f"{self.name}_sum", self._labels(key), total))
+                samples.append((f"{self.name}_count", self._labels(key), count))
+        return samples
+
+
+class Gauge(Metric):
+    """Gauge whose values are read from a callback at scrape time."""
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        callback: Optional[Callable[[], Iterable[tuple[dict, float]]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        if self.callback is None:
+            return []
+        return [
+            (self.name, self._labels(self._key(labels)), value)
+            for labels, value in self.callback()
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames=(), callback=None
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = Registry()
+
+REQUEST_DURATION = registry.histogram(
+    "reputato_request_duration_seconds",
+    "End-to-end time to answer an analysis request",
+    ["endpoint", "cache"],
+)
+AGENT_RUN_DURATION = registry.histogram(
+    "reputato_agent_run_duration_seconds",
+    "Time spent fetching one source profile",
+    ["source", "outcome"],
+)
+AGENT_TOOL_CALLS = registry.histogram(
+    "reputato_agent_tool_calls",
+    "MCP tool calls made during one agent run",
+    ["source"],
+    buckets=COUNT_BUCKETS,
+)
+AGENT_MODEL_REQUESTS = registry.histogram(
+    "reputato_agent_model_requests",
+    "Model requests made during one agent run",
+    ["source"],
+    buckets=COUNT_BUCKETS,
+)
+FAST_PATH_DURATION = registry.histogram(
+    "reputato_fast_path_duration_seconds",
+    "Time spent on the no-LLM fast path, by whether it produced the profile",
+    ["source", "outcome"],
+)
+MCP_TOOL_DURATION = registry.histogram(
+    "reputato_mcp_tool_call_duration_seconds",
+    "Time spent in one MCP tool call",
+    ["source", "tool", "outcome"],
+)
+TOOL_OUTPUT_BYTES = registry.counter(
+    "reputato_tool_output_bytes_total",
+    "Bytes of MCP page output before and after reduction",
+    ["source", "tool", "stage"],
+)
+TOOL_OUTPUT_TOKENS = registry.counter(
+    "reputato_tool_output_tokens_total",
+    "Estimated tokens of MCP page output before and after reduction",
+    ["source", "tool", "stage"],
+)
+SUMMARIZER_DURATION = registry.histogram(
+    "reputato_summarizer_duration_seconds",
+    "Time spent generating a summary",
+    ["model", "outcome"],
+)
+SUMMARIES = registry.counter(
+    "reputato_summaries_total",
+    "Summaries by how they were produced (memo, full or incremental)",
+    ["mode"],
+)
+TOKENS = registry.counter(
+    "reputato_tokens_total",
+    "Model tokens used, by caller and direction",
+    ["component", "model", "direction"],
+)
+RETRIES = registry.counter(
+    "reputato_agent_retries_total",
+    "Retry prompts sent back to a model after invalid output or tool errors",
+    ["component"],
+)
+TIMEOUTS = registry.counter(
+    "reputato_timeouts_total",
+    "Deadlines that expired",
+    ["stage"],
+)
+BUDGET_EXCEEDED = registry.counter(
+    "reputato_agent_budget_exceeded_total",
+    "Agent runs cut short by a tool call, model request or token budget",
+    ["source", "limit"],
+)
+SOURCE_OUTCOMES = registry.counter(
+    "reputato_source_outcomes_total",
+    "Result of each attempt to get a source profile",
+    ["source", "outcome"],
+)
+
+
+def count_tool_calls(messages) -> int:
+    # MCP tool calls only; the structured output arrives as a final_result call
+    return sum(
+        1
+        for m in messages
+        if isinstance(m, ModelResponse)
+        for part in m.parts
+        if isinstance(part, ToolCallPart)
+        and not part.tool_name.startswith("final_result")
+    )
+
+
+def record_run(component: str, result) -> None:
+    # Token, tool call and retry accounting for a finished pydantic-ai run
+    record_usage(component, result.usage(), result.all_messages())
+
+
+def record_usage(component: str, usage, messages) -> None:
+    # Same accounting from a run's usage and captured messages, for failed runs too
+    responses = [m for m in messages if isinstance(m, ModelResponse)]
+    model_name = next(
+        (m.model_name for m in reversed(responses) if m.model_name), "unknown"
+    )
+    TOKENS.inc(
+        usage.request_tokens or 0,
+        component=component,
+        model=model_name,
+        direction="input",
+    )
+    TOKENS.inc(
+        usage.response_tokens or 0,
+        component=component,
+        model=model_name,
+        direction="output",
+    )
+    retries = sum(
+        1 for m in messages for part in m.parts if isinstance(part, RetryPromptPart)
+    )
+    if retries:
+        RETRIES.inc(retries, component=component)
+    if component != "summarizer":
+        AGENT_TOOL_CALLS.observe(count_tool_calls(messages), source=component)
+        AGENT_MODEL_REQUESTS.observe(usage.requests, source=component)
@@ -10,6 +10,7 @@ class CompanySummaryWithRating(BaseModel):
 class CompanyResponse(BaseModel):
     summary: str
     rating: int
+    stale: bool = False  # Served past its TTL while a refresh is queued
 
 
 class LinkedInProfile(BaseModel):
@@ -42,3 +43,8 @@ class NewsProfile(BaseModel):
     layoffs: list[str]
     scandals: list[str]
     achievements: list[str]
+
+
+class BatchRequest(BaseModel):
+    names: list[str]
+    refresh: bool = False
@@ -0,0 +1,98 @@
+def build_linkedin_prompt(name: str) -> str:
+    return (
+        f"Your task is to find the LinkedIn profile for the company '{name}' and extract specific structured data.\n\n"
+        "Use the `web_data_linkedin_company_profile` tool if available to extract the following fields:\n"
+        "- Company name\n"
+        "- Company description (short summary of what the company does)\n"
+        "- Number of employees (as listed on the LinkedIn profile)\n"
+        "- Linkedin company profile url\n"
+        "- Headquarters address\n"
+        "- Year the company was founded (if available)\n"
+        "- Industry or sector (e.g., 'Software', 'Healthcare')\n"
+        "- Company website\n"
+        "If the structured LinkedIn tool is unavailable or insufficient, use the following tools in order:\n"
+        "1. `scraping_browser_navigate` — to visit the LinkedIn company page\n"
+        "2. `scraping_browser_get_text` — to extract visible page text\n"
+        "3. `scraping_browser_links` and `scraping_browser_click` — to navigate if needed\n\n"
+        "Return ONLY a JSON object with the following keys:\n"
+        "{\n"
+        '  "company_name": str,\n'
+        '  "description": str,\n'
+        '  "number_of_employees": str,\n'
+        '  "linkedin_url": str,\n'
+        '  "headquarters": str,\n'
+        '  "founded": str or null,\n'
+        '  "industry": str,\n'
+        '  "website": str,\n'
+        "}\n\n"
+        "Do not include raw HTML, markdown, explanations, or other fields. "
+        "If a field is missing, use null for that field. If the company cannot be found at all, return null."
+    )
+
+
+def build_glassdoor_prompt(name: str) -> str:
+    return (
+        f"Your task is to find the Glassdoor profile for the company '{name}' and extract specific structured data.\n\n"
+        "Extract the following fields:\n"
+        "- Overall company rating (float, out of 5)\n"
+        "- Total number of employee reviews\n"
+        "- A short summary of the top 5 pros and cons from employee reviews posted in 2025 or 2024 only\n\n"
+        "Use the following tools in order:\n"
+        "1. `scraping_browser_navigate` — to go to the Glassdoor company page\n"
+        "2. `scraping_browser_get_text` — to extract visible content\n"
+        "3. `scraping_browser_links` and `scraping_browser_click` — to find and open the review section if necessary\n\n"
+        "Return ONLY a JSON object with the following keys:\n"
+        "{\n"
+        '  "rating": float,\n'
+        '  "num_reviews": int,\n'
+        '  "review_summary": str\n'
+        "}\n\n"
+        "Only use reviews from 2025 or 2024. Do not include older reviews.\n"
+        "Do not include HTML, markdown, or explanations"
+        "If a field is missing, use null for that field. If the company cannot be found at all, return null."
+    )
+
+
+def build_crunchbase_prompt(name: str) -> str:
+    return (
+        f"Search for the Crunchbase profile of the company '{name}'. "
+        "Once you find the correct page, extract the following information:\n"
+        "- Year founded (as a string or null)\n"
+        "- Latest funding round name\n"
+        "- Funding round date\n"
+        "- Funding amount\n"
+        "- List of known investors (as strings)\n"
+        "- Key people (e.g., founders, CEOs, etc)\n\n"
+        "Use the following tools in order:\n"
+        "1. `scraping_browser_navigate`\n"
+        "2. `scraping_browser_get_text`\n"
+        "3. `scraping_browser_links` and `scraping_browser_click`\n\n"
+        "Return ONLY a JSON object with the following keys:\n"
+        "{\n"
+        '  "founded": str or null,\n'
+        '  "funding_round": str or null,\n'
+        '  "funding_date": str or null,\n'
+        '  "funding_amount": str or null,\n'
+        '  "investors": list[str] or null,\n'
+        '  "key_people": list[str] or null\n'
+        "}\n\n"
+        "Do not include HTML, markdown, or explanations"
+        "If a field is missing, use null for that field. If the company cannot be found at all, return null."
+    )
+
+
+def build_news_prompt(name: str) -> str:
+    return (
+        f"Search for news about the company '{name}' from 2023, 2024, and 2025.\n\n"
+        "Extract the following if available:\n"
+        "- Layoffs: Dates and brief summaries of any layoff announcements.\n"
+        "- Scandals: Brief, neutral headlines about controversies or investigations.\n"
+        "- Achievements: Public product launches, funding milestones, acquisitions, or major hires.\n\n"
+        "Return a structured JSON object with keys:\n"
+        "{\n"
+        "  'layoffs': list[str],\n"
+        "  'scandals': list[str],\n"
+        "  'achievements': list[str]\n"
+        "}\n\n"
+        "If no news is found in a category, return an empty list. Do not include HTML, explanations, or irrelevant information."
+    )
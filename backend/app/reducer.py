@@ -0,0 +1,218 @@
+import html
+import logging
+import re
+from collections import defaultdict
+
+from app import metrics
+from app.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Tools that return whole rendered pages
+PAGE_TOOLS = {"scrape_as_markdown", "scrape_as_html", "scraping_browser_get_text"}
+
+# Lines worth keeping for each source's output model
+SOURCE_KEYWORDS = {
+    "linkedin": [
+        "about",
+        "overview",
+        "employees",
+        "company size",
+        "headquarters",
+        "founded",
+        "industry",
+        "website",
+        "specialties",
+    ],
+    "glassdoor": [
+        "rating",
+        "reviews",
+        "review",
+        "pros",
+        "cons",
+        "recommend",
+        "approve",
+        "ceo",
+        "culture",
+        "work/life",
+        "work-life",
+        "management",
+        "out of 5",
+        "stars",
+    ],
+    "crunchbase": [
+        "funding",
+        "raised",
+        "round",
+        "series",
+        "seed",
+        "investor",
+        "led by",
+        "acquired",
+        "valuation",
+        "founded",
+        "founder",
+        "ceo",
+        "cto",
+        "key people",
+        "ipo",
+    ],
+    "news": [
+        "layoff",
+        "laid off",
+        "job cuts",
+        "lawsuit",
+        "scandal",
+        "fine",
+        "investigation",
+        "acquire",
+        "launch",
+        "award",
+        "raise",
+        "funding",
+        "growth",
+        "record",
+    ],
+}
+
+
+def keyword_pattern(keywords: list[str]) -> re.Pattern:
+    # Whole words, allowing plurals and simple inflections ("raised", "raising",
+    # "layoffs"), so "round" does not match "around" nor "fine" "define"
+    words = []
+    for keyword in keywords:
+        words.append(re.escape(keyword))
+        if keyword.endswith("e"):
+            words.append(re.escape(keyword[:-1]) + "ing")
+    return re.compile(
+        r"\b(?:" + "|".join(words) + r")(?:s|es|d|ed|ing)?\b", re.IGNORECASE
+    )
+
+
+SOURCE_PATTERNS = {
+    source: keyword_pattern(keywords) for source, keywords in SOURCE_KEYWORDS.items()
+}
+
+# Navigation and legal chrome, matched against whole (short) lines
+BOILERPLATE = re.compile(
+    r"^(sign in|sign up|log in|join now|skip to .*|menu|share( this)?|subscribe"
+    r"|follow us.*|(download|get) the app|back to top|(see|show|load) more"
+    r"|(accept( all)? )?cookies?( policy| settings| preferences)?"
+    r"|privacy( policy)?( terms)?|terms( of (use|service))?"
+    r"|home(\s*[>/›»]\s*[^>/›»]+)*|(©|copyright).*|all rights reserved\.?)$",
+    re.IGNORECASE,
+)
+MARKDOWN_LINK_ONLY = re.compile(r"^(\W*\[[^\]]*\]\([^)]*\)\W*)+$")
+MARKDOWN_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+HTML_DROP = re.compile(
+    r"<(script|style|noscript|svg|nav|footer|header)\b.*?</\1>",
+    re.IGNORECASE | re.DOTALL,
+)
+HTML_BLOCK = re.compile(
+    r"</?(p|div|br|li|ul|ol|tr|td|th|h[1-6]|section|article)\b[^>]*>", re.IGNORECASE
+)
+HTML_TAG = re.compile(r"<[^>]+>")
+
+# (source, tool) -> calls, bytes and estimated tokens before/after reduction
+stats: dict[tuple[str, str], dict[str, int]] = defaultdict(
+    lambda: {
+        "calls": 0,
+        "bytes_in": 0,
+        "bytes_out": 0,
+        "tokens_in": 0,
+        "tokens_out": 0,
+    }
+)
+
+
+def html_to_text(text: str) -> str:
+    text = HTML_DROP.sub(" ", text)
+    text = HTML_BLOCK.sub("\n", text)
+    return html.unescape(HTML_TAG.sub(" ", text))
+
+
+# Lines at least this long are dropped when they repeat anywhere on the page (nav
+# blocks, repeated banners); shorter ones like "Pros" only when directly repeated
+REPEATED_LINE_MIN_CHARS = 40
+
+
+def clean_lines(text: str) -> list[str]:
+    lines = []
+    seen = set()
+    previous = None
+    for raw in text.splitlines():
+        line = re.sub(r"\s+", " ", MARKDOWN_IMAGE.sub("", raw)).strip(" \t|#*->")
+        if not line or BOILERPLATE.match(line) or MARKDOWN_LINK_ONLY.match(line):
+            continue
+        key = line.casefold()
+        if key == previous:
+            continue
+        previous = key
+        if len(line) >= REPEATED_LINE_MIN_CHARS:
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def relevant_lines(
+    lines: list[str], keywords: re.Pattern, context: int = 1
+) -> list[str]:
+    # Keep lines mentioning a target field plus a little context around them
+    keep = set()
+    for i, line in enumerate(lines):
+        if keywords.search(line):
+            keep.update(range(max(0, i - context), min(len(lines), i + context + 1)))
+    return [line for i, line in enumerate(lines) if i in keep]
+
+
+def reduce_text(text: str, source: str, tool: str, max_chars: int) -> str:
+    if tool == "scrape_as_html":
+        text = html_to_text(text)
+    lines = clean_lines(text)
+    keywords = SOURCE_PATTERNS.get(source)
+    if keywords and sum(len(line) + 1 for line in lines) > max_chars:
+        lines = relevant_lines(lines, keywords) or lines
+    reduced = "\n".join(lines)
+    if len(reduced) > max_chars:
+        reduced = reduced[:max_chars].rsplit("\n", 1)[0] + "\n[truncated]"
+    return reduced
+
+
+def reduce_tool_output(source: str, tool: str, text: str, max_chars: int) -> str:
+    reduced = reduce_text(text, source, tool, max_chars)
+    bytes_in, bytes_out = len(text.encode()), len(reduced.encode())
+    tokens_in, tokens_out = estimate_tokens(text), estimate_tokens(reduced)
+
+    entry = stats[(source, tool)]
+    entry["calls"] += 1
+    entry["bytes_in"] += bytes_in
+    entry["bytes_out"] += bytes_out
+    entry["tokens_in"] += tokens_in
+    entry["tokens_out"] += tokens_out
+    metrics.TOOL_OUTPUT_BYTES.inc(bytes_in, source=source, tool=tool, stage="raw")
+    metrics.TOOL_OUTPUT_BYTES.inc(bytes_out, source=source, tool=tool, stage="reduced")
+    metrics.TOOL_OUTPUT_TOKENS.inc(tokens_in, source=source, tool=tool, stage="raw")
+    metrics.TOOL_OUTPUT_TOKENS.inc(
+        tokens_out, source=source, tool=tool, stage="reduced"
+    )
+    logger.debug(
+        f"Reduced {tool} output for {source}: {bytes_in} -> {bytes_out} bytes "
+        f"(~{tokens_in} -> ~{tokens_out} tokens)"
+    )
+    return reduced
+
+
+def stats_summary() -> dict:
+    return {
+        f"{source}:{tool}": {
+            **entry,
+            "reduction": (
+                round(1 - entry["bytes_out"] / entry["bytes_in"], 4)
+                if entry["bytes_in"]
+                else 0.0
+            ),
+        }
+        for (source, tool), entry in sorted(stats.items())
+    }
@@ -0,0 +1,143 @@
+"""Re-run profile extraction against stored scrapes instead of scraping again.
+
+    python -m app.reextract --source glassdoor --concurrency 8
+
+Writes the new profiles to the profile cache, so use CACHE_BACKEND=sqlite to share
+them with the running server.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from pydantic import BaseModel, ValidationError
+from pydantic_ai import Agent
+from pydantic_ai.settings import ModelSettings
+
+from app.entities import match_key
+from app.linkedin import first_record, map_linkedin_record
+from app.reducer import reduce_text
+from app.scrape_store import ScrapeStore
+
+logger = logging.getLogger(__name__)
+
+EXTRACT_SYSTEM_PROMPT = (
+    "You extract structured company profiles from pages that were scraped earlier. "
+    "Use only the page text you are given. Never guess or assume anything. "
+    "If a field is not in the pages, return null for it (or an empty list for lists)."
+)
+
+
+def create_extract_agent(model: str, output_type, request_timeout: float) -> Agent:
+    return Agent(
+        model,
+        output_type=output_type,
+        system_prompt=EXTRACT_SYSTEM_PROMPT,
+        model_settings=ModelSettings(request_timeout=request_timeout, max_tokens=2048),
+    )
+
+
+def build_extract_prompt(
+    source: str, name: str, artifacts: list[dict], max_chars: int
+) -> str:
+    # Newest pages first, each reduced, until the character budget is used up
+    sections = []
+    remaining = max_chars
+    for artifact in reversed(artifacts):
+        if remaining <= 0:
+            break
+        text = reduce_text(artifact["content"], source, artifact["tool"], remaining)
+        sections.append(f"--- {artifact['tool']} {artifact['url']} ---\n{text}")
+        remaining -= len(text)
+    pages = "\n\n".join(sections)
+    return (
+        f"Extract the {source} profile for the company '{name}' "
+        f"from these previously scraped pages:\n\n{pages}"
+    )
+
+
+async def reextract_profile(
+    agent: Agent,
+    store: ScrapeStore,
+    source: str,
+    name: str,
+    company_key: str,
+    max_chars: int,
+) -> Optional[BaseModel]:
+    artifacts = await asyncio.to_thread(store.artifacts, source, company_key)
+    if not artifacts:
+        return None
+
+    if source == "linkedin":
+        # Structured LinkedIn records map straight onto the profile, no LLM needed
+        for artifact in reversed(artifacts):
+            if artifact["tool"] != "web_data_linkedin_company_profile":
+                continue
+            record = first_record(artifact["content"])
+            if record is None:
+                continue
+            try:
+                profile = map_linkedin_record(record)
+            except ValidationError as e:
+                logger.info(f"Stored LinkedIn record for {name} is invalid: {e}")
+                continue
+            if match_key(profile.company_name) == match_key(name):
+                return profile
+
+    prompt = build_extract_prompt(source, name, artifacts, max_chars)
+    result = await agent.run(prompt)
+    return result.output
+
+
+async def reextract_all(sources: list[str], concurrency: int, limit: int) -> None:
+    from app import main
+
+    if main.scrape_store is None:
+        raise SystemExit("SCRAPE_STORE_DIR is empty, nothing to re-extract")
+    if main.CACHE_BACKEND != "sqlite":
+        logger.warning("CACHE_BACKEND is not sqlite, results won't outlive this run")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    counts = {"updated": 0, "skipped": 0, "failed": 0}
+
+    async def one(source: str, name: str) -> None:
+        async with semaphore:
+            try:
+                profile = await main.reextract_source(source, name)
+            except Exception as e:
+                logger.error(f"Re-extraction failed for {source}:{name}: {e}")
+                counts["failed"] += 1
+                return
+            counts["updated" if profile is not None else "skipped"] += 1
+
+    pairs = [
+        (source, name)
+        for source in sources
+        for _, _, name in main.scrape_store.companies(source)
+    ]
+    if limit:
+        pairs = pairs[:limit]
+    await asyncio.gather(*(one(source, name) for source, name in pairs))
+    print(json.dumps({"companies": len(pairs), **counts}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--source",
+        action="append",
+        choices=["linkedin", "glassdoor", "crunchbase", "news"],
+        help="Source to re-extract (repeatable, default: all)",
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=0, help="Max companies (0 = all)")
+    args = parser.parse_args()
+    asyncio.run(
+        reextract_all(
+            args.source or ["linkedin", "glassdoor", "crunchbase", "news"],
+            args.concurrency,
+            args.limit,
+        )
+    )
@@ -0,0 +1,316 @@
+import asyncio
+import fcntl
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import IO, Awaitable, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def claim_lock(path: str) -> Optional[IO]:
+    # Exclusive lock held until the file is closed (or the process exits), so only
+    # one of several API workers runs the refresher; None if another holds it
+    lock = open(path, "a")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
+
+class RefreshRequests:
+    """Companies waiting for a background refresh, kept in SQLite so stale hits
+    on any API worker reach the one running the refresher. Requests for the same
+    company coalesce into one. Methods block on SQLite, so async code calls them
+    through `asyncio.to_thread`.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS refresh_requests ("
+            " key TEXT PRIMARY KEY,"
+            " name TEXT NOT NULL,"
+            " requested_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def add(self, key: str, name: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO refresh_requests (key, name, requested_at)"
+                " VALUES (?, ?, ?)",
+                (key, name, time.time()),
+            )
+            self._conn.commit()
+
+    def take(self, limit: int) -> list[tuple[str, str]]:
+        # Oldest requests first, removed as they are handed out
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, name FROM refresh_requests"
+                " ORDER BY requested_at LIMIT ?",
+                (limit,),
+            ).fetchall()
+            self._conn.executemany(
+                "DELETE FROM refresh_requests WHERE key = ?",
+                [(key,) for key, _ in rows],
+            )
+            self._conn.commit()
+        return rows
+
+
+class Watchlist:
+    """Companies to keep warm: a pinned list plus the most requested ones.
+
+    Popularity is a request count that halves every `half_life` seconds, so
+    companies nobody asks about anymore drop off on their own.
+    """
+
+    def __init__(
+        self,
+        pinned: Iterable[tuple[str, str]],
+        max_size: int,
+        min_score: float,
+        half_life: float,
+    ):
+        self.max_size = max_size
+        self.min_score = min_score
+        self.half_life = half_life
+        self._pinned: dict[str, str] = dict(pinned)
+        self._scores: dict[str, tuple[float, float, str]] = {}
+
+    def _score(self, key: str, now: float) -> float:
+        score, updated_at, _ = self._scores[key]
+        return score * 0.5 ** ((now - updated_at) / self.half_life)
+
+    def record(self, key: str, name: str) -> None:
+        now = time.time()
+        score = self._score(key, now) if key in self._scores else 0.0
+        self._scores[key] = (score + 1, now, name)
+        if len(self._scores) > 10 * self.max_size:
+            self._prune(now)
+
+    def pin(self, key: str, name: str) -> None:
+        self._pinned[key] = name
+
+    def unpin(self, key: str) -> bool:
+        return self._pinned.pop(key, None) is not None
+
+    def popular(self) -> list[dict]:
+        now = time.time()
+        ranked = sorted(
+            ((self._score(key, now), key) for key in self._scores),
+            reverse=True,
+        )
+        return [
+            {"key": key, "name": self._scores[key][2], "score": round(score, 3)}
+            for score, key in ranked[: self.max_size]
+            if score >= self.min_score and key not in self._pinned
+        ]
+
+    def companies(self) -> list[tuple[str, str]]:
+        # (cache key, name) for every watched company, pinned first
+        watched = list(self._pinned.items())
+        watched += [(entry["key"], entry["name"]) for entry in self.popular()]
+        return watched
+
+    def stats(self) -> dict:
+        return {
+            "pinned": [
+                {"key": key, "name": name} for key, name in self._pinned.items()
+            ],
+            "popular": self.popular(),
+            "tracked": len(self._scores),
+        }
+
+    def _prune(self, now: float) -> None:
+        ranked = sorted(self._scores, key=lambda key: self._score(key, now))
+        for key in ranked[: len(ranked) - self.max_size]:
+            del self._scores[key]
+
+
+class Refresher:
+    """Refreshes cached companies in the background, ahead of their TTL.
+
+    The scheduler queues watched companies that `is_due`; interactive requests that
+    were served a stale entry queue theirs through `revalidate`. On workers that
+    do not run the refresher, `revalidate` leaves the request in the shared
+    `requests`, which the running refresher polls every `request_poll` seconds.
+    Refreshes are rate limited to `rate` per minute and wait while `is_busy` says
+    the MCP servers are needed for interactive traffic.
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[str], Awaitable[None]],
+        is_due: Callable[[str], Awaitable[bool]],
+        is_busy: Callable[[], bool],
+        watchlist: Watchlist,
+        interval: float,
+        concurrency: int,
+        rate: float,
+        retry_after: float,
+        max_size: int,
+        requests: Optional[RefreshRequests] = None,
+        busy_poll: float = 5,
+        request_poll: float = 5,
+    ):
+        self.refresh = refresh
+        self.is_due = is_due
+        self.is_busy = is_busy
+        self.watchlist = watchlist
+        self.interval = interval
+        self.concurrency = concurrency
+        self.rate = rate
+        self.retry_after = retry_after
+        self.requests = requests
+        self.busy_poll = busy_poll
+        self.request_poll = request_poll
+        self._queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue(maxsize=max_size)
+        self._queued: set[str] = set()
+        self._last_attempt: dict[str, float] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._tokens = float(concurrency)
+        self._refilled = time.monotonic()
+        self.running = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.deferred = 0
+        self.dropped = 0
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._schedule())]
+        if self.requests is not None:
+            self._tasks.append(asyncio.create_task(self._poll_requests()))
+        self._tasks += [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+        logger.info(
+            f"Started background refresher ({self.concurrency} workers, "
+            f"{self.rate}/min, every {self.interval}s)"
+        )
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def revalidate(self, key: str, name: str) -> bool:
+        # Queue a refresh here, or for the worker running the refresher
+        if self._tasks:
+            return self._enqueue(key, name)
+        if self.requests is None:
+            return False
+        await asyncio.to_thread(self.requests.add, key, name)
+        return True
+
+    def _enqueue(self, key: str, name: str) -> bool:
+        # Unless one is already queued or was attempted recently
+        if key in self._queued:
+            return False
+        if time.time() - self._last_attempt.get(key, 0) < self.retry_after:
+            return False
+        try:
+            self._queue.put_nowait((key, name))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.debug(f"Refresh queue full, dropping {name}")
+            return False
+        self._queued.add(key)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "enabled": bool(self._tasks),
+            "running": self.running,
+            "queued": self._queue.qsize(),
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "deferred": self.deferred,
+            "dropped": self.dropped,
+            "rate_per_minute": self.rate,
+            "watchlist": self.watchlist.stats(),
+        }
+
+    async def _schedule(self) -> None:
+        while True:
+            cutoff = time.time() - self.retry_after
+            self._last_attempt = {
+                key: at for key, at in self._last_attempt.items() if at > cutoff
+            }
+            for key, name in self.watchlist.companies():
+                try:
+                    if await self.is_due(name) and self._enqueue(key, name):
+                        logger.info(f"Scheduled background refresh for {name}")
+                except Exception as e:
+                    logger.error(f"Refresh check failed for {name}: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    async def _poll_requests(self) -> None:
+        while True:
+            room = self._queue.maxsize - self._queue.qsize()
+            if room > 0:
+                try:
+                    taken = await asyncio.to_thread(self.requests.take, room)
+                except Exception as e:
+                    logger.error(f"Reading refresh requests failed: {e}", exc_info=True)
+                    taken = []
+                for key, name in taken:
+                    self._enqueue(key, name)
+            await asyncio.sleep(self.request_poll)
+
+    async def _take_token(self) -> None:
+        deferred = False
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.concurrency,
+                self._tokens + (now - self._refilled) * self.rate / 60,
+            )
+            self._refilled = now
+            if self.is_busy():
+                if not deferred:
+                    self.deferred += 1
+                    deferred = True
+                await asyncio.sleep(self.busy_poll)
+            elif self._tokens < 1:
+                await asyncio.sleep(math.ceil((1 - self._tokens) * 60 / self.rate))
+            else:
+                self._tokens -= 1
+                return
+
+    async def _worker(self) -> None:
+        while True:
+            key, name = await self._queue.get()
+            try:
+                await self._take_token()
+                self._last_attempt[key] = time.time()
+                await self._run(name)
+            finally:
+                self._queued.discard(key)
+                self._queue.task_done()
+
+    async def _run(self, name: str) -> None:
+        self.running += 1
+        try:
+            await self.refresh(name)
+            self.refreshed += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Background refresh of {name} failed: {e}", exc_info=True)
+        finally:
+            self.running -= 1
@@ -0,0 +1,290 @@
+import asyncio
+import contextvars
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# (key, display name) of the company the current source run is for, so stored
+# pages can be found per company and re-extracted under the name it was asked as
+current_company: contextvars.ContextVar[Optional[tuple[str, str]]] = (
+    contextvars.ContextVar("current_company", default=None)
+)
+
+# Set for refreshes, which must scrape again rather than reuse a recent fetch
+bypass_store_reuse: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "bypass_store_reuse", default=False
+)
+
+# Tools whose raw output is worth keeping for re-extraction
+STORED_TOOLS = {
+    "scrape_as_markdown",
+    "scrape_as_html",
+    "scraping_browser_get_text",
+    "web_data_linkedin_company_profile",
+}
+
+
+def request_key(tool: str, url: Optional[str], arguments: dict[str, Any]) -> str:
+    return json.dumps([tool, url, arguments], sort_keys=True)
+
+
+# Blobs written this recently are never pruned, so a put that wrote (or touched)
+# its blob but has not indexed it yet does not lose it
+PRUNE_GRACE = 60
+
+
+class ScrapeStore:
+    """Raw MCP tool output, gzip-compressed and stored by its sha256.
+
+    Blobs live under `root/objects/`, and an SQLite index records which source,
+    company, tool and URL each fetch was for and when it happened. Identical
+    pages are stored once however often they are fetched. Methods block on disk
+    I/O, so async code calls them through `asyncio.to_thread`.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._objects = os.path.join(root, "objects")
+        os.makedirs(self._objects, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(root, "index.db"), check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fetches ("
+            " id INTEGER PRIMARY KEY,"
+            " source TEXT NOT NULL,"
+            " company TEXT,"
+            " name TEXT,"
+            " tool TEXT NOT NULL,"
+            " url TEXT,"
+            " request_key TEXT NOT NULL,"
+            " digest TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " fetched_at REAL NOT NULL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(fetches)")}
+        if "name" not in columns:
+            # Indexes written before display names were stored
+            self._conn.execute("ALTER TABLE fetches ADD COLUMN name TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS fetches_request"
+            " ON fetches (source, request_key, fetched_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS fetches_company"
+            " ON fetches (source, company, fetched_at)"
+        )
+        self._conn.commit()
+        self.reused = 0
+        self.stored = 0
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self._objects, digest[:2], f"{digest}.gz")
+
+    def put(
+        self,
+        source: str,
+        tool: str,
+        url: Optional[str],
+        arguments: dict[str, Any],
+        content: str,
+        company: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> str:
+        data = content.encode()
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(gzip.compress(data))
+            os.replace(tmp, path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO fetches"
+                " (source, company, name, tool, url, request_key, digest, size,"
+                " fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    source,
+                    company,
+                    name,
+                    tool,
+                    url,
+                    request_key(tool, url, arguments),
+                    digest,
+                    len(data),
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+        self.stored += 1
+        return digest
+
+    def read(self, digest: str) -> Optional[str]:
+        try:
+            with open(self._path(digest), "rb") as f:
+                return gzip.decompress(f.read()).decode()
+        except FileNotFoundError:
+            return None
+
+    def recent(
+        self,
+        source: str,
+        tool: str,
+        url: Optional[str],
+        arguments: dict[str, Any],
+        max_age: float,
+    ) -> Optional[str]:
+        # Latest output of the same call, if it was fetched within max_age seconds
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM fetches"
+                " WHERE source = ? AND request_key = ? AND fetched_at >= ?"
+                " ORDER BY fetched_at DESC LIMIT 1",
+                (source, request_key(tool, url, arguments), time.time() - max_age),
+            ).fetchone()
+        content = self.read(row[0]) if row else None
+        if content is not None:
+            self.reused += 1
+        return content
+
+    def artifacts(self, source: str, company: str) -> list[dict]:
+        # Latest stored output per (tool, url) for one company
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT tool, url, digest, MAX(fetched_at) FROM fetches"
+                " WHERE source = ? AND company = ?"
+                " GROUP BY tool, url ORDER BY MAX(fetched_at)",
+                (source, company),
+            ).fetchall()
+        artifacts = []
+        for tool, url, digest, fetched_at in rows:
+            content = self.read(digest)
+            if content is not None:
+                artifacts.append(
+                    {
+                        "tool": tool,
+                        "url": url,
+                        "fetched_at": fetched_at,
+                        "content": content,
+                    }
+                )
+        return artifacts
+
+    def companies(self, source: Optional[str] = None) -> list[tuple[str, str, str]]:
+        # (source, company key, display name); older fetches without a name fall
+        # back to the key
+        query = (
+            "SELECT source, company, COALESCE(MAX(name), company) FROM fetches"
+            " WHERE company IS NOT NULL{} GROUP BY source, company"
+            " ORDER BY source, company"
+        )
+        with self._lock:
+            if source is None:
+                rows = self._conn.execute(query.format("")).fetchall()
+            else:
+                rows = self._conn.execute(
+                    query.format(" AND source = ?"), (source,)
+                ).fetchall()
+        return rows
+
+    def prune(self, max_age: float = 0, max_bytes: int = 0) -> int:
+        # Forget fetches older than max_age, then the least recently fetched pages
+        # until the blobs fit in max_bytes. Returns the number of blobs deleted.
+        with self._lock:
+            if max_age:
+                self._conn.execute(
+                    "DELETE FROM fetches WHERE fetched_at < ?",
+                    (time.time() - max_age,),
+                )
+                self._conn.commit()
+            by_age = self._conn.execute(
+                "SELECT digest FROM fetches GROUP BY digest ORDER BY MAX(fetched_at)"
+            ).fetchall()
+        referenced = [digest for (digest,) in by_age]
+        live = set(referenced)
+        blobs = self._blobs()
+        cutoff = time.time() - PRUNE_GRACE
+        deleted = 0
+        for digest, (size, mtime) in list(blobs.items()):
+            if digest not in live and mtime < cutoff:
+                deleted += self._delete_blob(digest)
+                del blobs[digest]
+
+        total = sum(size for size, _ in blobs.values())
+        evicted = []
+        for digest in referenced:
+            if not max_bytes or total <= max_bytes:
+                break
+            if digest in blobs and blobs[digest][1] < cutoff:
+                total -= blobs[digest][0]
+                evicted.append(digest)
+                deleted += self._delete_blob(digest)
+        if evicted:
+            with self._lock:
+                self._conn.executemany(
+                    "DELETE FROM fetches WHERE digest = ?",
+                    [(digest,) for digest in evicted],
+                )
+                self._conn.commit()
+        if deleted:
+            logger.info(f"Pruned {deleted} blobs from the scrape store")
+        return deleted
+
+    def _blobs(self) -> dict[str, tuple[int, float]]:
+        # digest -> (size on disk, mtime)
+        blobs = {}
+        for directory in os.scandir(self._objects):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                if entry.name.endswith(".gz"):
+                    stat = entry.stat()
+                    blobs[entry.name[:-3]] = (stat.st_size, stat.st_mtime)
+        return blobs
+
+    def _delete_blob(self, digest: str) -> int:
+        try:
+            os.remove(self._path(digest))
+            return 1
+        except FileNotFoundError:
+            return 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            fetches, blobs, fetched_bytes = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT digest), COALESCE(SUM(size), 0)"
+                " FROM fetches"
+            ).fetchone()
+        return {
+            "root": self.root,
+            "fetches": fetches,
+            "blobs": blobs,
+            "fetched_bytes": fetched_bytes,
+            "stored": self.stored,
+            "reused": self.reused,
+        }
+
+
+async def prune_periodically(
+    store: ScrapeStore, interval: float, max_age: float, max_bytes: int
+) -> None:
+    while True:
+        try:
+            await asyncio.to_thread(store.prune, max_age, max_bytes)
+        except Exception as e:
+            logger.error(f"Scrape store pruning failed: {e}", exc_info=True)
+        await asyncio.sleep(interval)
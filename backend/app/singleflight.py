@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key into one shared task.
+
+    Callers await the shared task through `asyncio.shield`, so a caller being
+    cancelled (e.g. a client disconnecting) never cancels the work for the others.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = 0
+        self.joined = 0
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._waiters: dict[str, int] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task, _ = self.start(key, fn)
+        return await self.wait(key, task)
+
+    def start(
+        self, key: str, fn: Callable[[], Awaitable[Any]]
+    ) -> tuple[asyncio.Task, bool]:
+        # The shared task for `key`, and whether this call started it
+        task = self._tasks.get(key)
+        if task is not None:
+            self.joined += 1
+            logger.info(f"Joining in-flight {self.name} call for {key}")
+            return task, False
+        task = asyncio.ensure_future(fn())
+        self._tasks[key] = task
+        task.add_done_callback(lambda t: self._forget(key, t))
+        self.started += 1
+        return task, True
+
+    async def wait(self, key: str, task: asyncio.Task) -> Any:
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def abandon(self, key: str) -> bool:
+        # Cancel the shared task, but only if nobody is waiting on it anymore
+        task = self._tasks.get(key)
+        if task is None or self._waiters.get(key):
+            return False
+        task.cancel()
+        return True
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight(),
+            "started": self.started,
+            "joined": self.joined,
+        }
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+
+class FlightClaims:
+    """Claims on in-flight work, kept in SQLite so API workers sharing the file
+    coalesce it too: the worker whose claim succeeds runs it, the others wait for
+    the claim to be released. The owner keeps extending its claim, so a claim
+    only expires, `ttl` seconds later, if its worker died. Methods block on
+    SQLite, so async code calls them through `asyncio.to_thread`.
+    """
+
+    def __init__(self, path: str, ttl: float):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.owner = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS flight_claims ("
+            " key TEXT PRIMARY KEY,"
+            " owner TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self.claimed = 0
+        self.waited = 0
+
+    def claim(self, key: str) -> bool:
+        # True if this worker now owns `key`; taking over an expired claim counts
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO flight_claims (key, owner, expires_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET"
+                " owner = excluded.owner, expires_at = excluded.expires_at"
+                " WHERE flight_claims.expires_at < ?",
+                (key, self.owner, now + self.ttl, now),
+            )
+            self._conn.commit()
+        if cursor.rowcount:
+            self.claimed += 1
+            return True
+        self.waited += 1
+        return False
+
+    def held(self, key: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM flight_claims WHERE key = ? AND expires_at >= ?",
+                (key, time.time()),
+            ).fetchone()
+        return row is not None
+
+    def extend(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE flight_claims SET expires_at = ? WHERE key = ? AND owner = ?",
+                (time.time() + self.ttl, key, self.owner),
+            )
+            self._conn.commit()
+
+    async def keep(self, key: str) -> None:
+        # Extends the claim until cancelled
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            await asyncio.to_thread(self.extend, key)
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM flight_claims WHERE key = ? AND owner = ?",
+                (key, self.owner),
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        return {"claimed": self.claimed, "waited": self.waited}
+
+
+class Broadcast:
+    """Events published by one shared task, replayed to every consumer.
+
+    A consumer that subscribes late first gets the events it missed, then follows
+    along until the task closes the broadcast.
+    """
+
+    def __init__(self):
+        self.events: list[dict] = []
+        self.closed = False
+        self._published = asyncio.Event()
+
+    def publish(self, **event) -> None:
+        self.events.append(event)
+        self._wake()
+
+    def close(self) -> None:
+        self.closed = True
+        self._wake()
+
+    async def subscribe(self) -> AsyncIterator[dict]:
+        seen = 0
+        while True:
+            while seen < len(self.events):
+                seen += 1
+                yield self.events[seen - 1]
+            if self.closed:
+                return
+            await self._published.wait()
+
+    def _wake(self) -> None:
+        self._published.set()
+        self._published = asyncio.Event()
@@ -1,5 +1,7 @@
 from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, ToolCallPart
 from pydantic_ai.settings import ModelSettings
+import pydantic_core
 import unicodedata
 import re
 from app.models import (
@@ -9,19 +11,60 @@ from app.models import (
     CrunchbaseProfile,
     NewsProfile,
 )
+import hashlib
 import json
-from typing import Optional
+import os
+import time
+from typing import AsyncIterator, Optional, Union
 import logging
 
 from dotenv import load_dotenv
 
+from app import metrics
+from app.cache import create_cache
+from app.entities import match_key
+from app.tokens import CHARS_PER_TOKEN, estimate_tokens
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 REQUEST_TIMEOUT = 120  # 2 minutes for summarization
+SUMMARIZER_MODEL = os.getenv("SUMMARIZER_MODEL", "anthropic:claude-3-5-sonnet-latest")
+
+# Companies with little data go to a faster, cheaper model
+SUMMARIZER_FAST_MODEL = os.getenv(
+    "SUMMARIZER_FAST_MODEL", "anthropic:claude-3-5-haiku-latest"
+)
+FAST_MODEL_MAX_SOURCES = int(os.getenv("FAST_MODEL_MAX_SOURCES", "2"))
+
+# Rough token budgets for the profile data in the prompt (~4 characters per token)
+PROMPT_DATA_TOKEN_BUDGET = int(os.getenv("PROMPT_DATA_TOKEN_BUDGET", "2000"))
+PROMPT_FIELD_TOKEN_BUDGET = int(os.getenv("PROMPT_FIELD_TOKEN_BUDGET", "300"))
+PROMPT_MAX_LIST_ITEMS = int(os.getenv("PROMPT_MAX_LIST_ITEMS", "8"))
+
+# Summaries are memoized on a hash of the input profiles, the model and the prompt,
+# so unchanged data never pays for another summarizer call. Bump
+# SUMMARY_PROMPT_VERSION whenever the prompts below change. The memo keeps the raw
+# model output, which is the base for incremental updates; clean_summary is applied
+# when it is returned.
+SUMMARY_PROMPT_VERSION = 3
+SUMMARY_MEMO_TTL = int(os.getenv("SUMMARY_MEMO_TTL", str(30 * 24 * 60 * 60)))
+SUMMARY_MEMO_MAX_SIZE = int(os.getenv("SUMMARY_MEMO_MAX_SIZE", "5000"))
+# Update the previous summary from what changed instead of rewriting it, when at
+# most SUMMARY_INCREMENTAL_MAX_SOURCES sources changed since it was written
+SUMMARY_INCREMENTAL = os.getenv("SUMMARY_INCREMENTAL", "false").lower() == "true"
+SUMMARY_INCREMENTAL_MAX_SOURCES = int(os.getenv("SUMMARY_INCREMENTAL_MAX_SOURCES", "1"))
+
+summary_memo = create_cache(
+    os.getenv("CACHE_BACKEND", "memory"),
+    SUMMARY_MEMO_TTL,
+    SUMMARY_MEMO_MAX_SIZE,
+    os.getenv("CACHE_DB_PATH", "cache.db"),
+    "summaries",
+)
 
 summarizer_agent = Agent(
-    model="anthropic:claude-3-5-sonnet-latest",
+    model=SUMMARIZER_MODEL,
     output_type=CompanySummaryWithRating,
     system_prompt=(
         "You are an OSINT analyst who writes honest and useful summaries of companies for job seekers. "
@@ -61,43 +104,110 @@ def clean_summary(text: str) -> str:
     return cleaned.strip()
 
 
-def format_data_for_prompt(data: Optional[dict], source_name: str) -> str:
+def _truncate(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    # Cut at a word boundary so the model doesn't see half a word
+    cut = text[:max_chars].rsplit(" ", 1)[0]
+    return cut.rstrip(" ,;:") + "…"
+
+
+def compact_data(value, field_tokens: int, max_items: int):
+    # Drop nulls and empties, cap long strings and long lists
+    if isinstance(value, dict):
+        compacted = {
+            key: compact_data(item, field_tokens, max_items)
+            for key, item in value.items()
+        }
+        return {
+            key: item
+            for key, item in compacted.items()
+            if item not in (None, "", [], {})
+        }
+    if isinstance(value, list):
+        items = [compact_data(item, field_tokens, max_items) for item in value]
+        items = [item for item in items if item not in (None, "", [], {})]
+        # Long lists share the field budget instead of each getting all of it
+        per_item = max(field_tokens // max(min(len(items), max_items), 1), 20)
+        return [
+            _truncate(item, per_item) if isinstance(item, str) else item
+            for item in items[:max_items]
+        ]
+    if isinstance(value, str):
+        return _truncate(value.strip(), field_tokens)
+    return value
+
+
+def format_data_for_prompt(
+    data: Optional[dict],
+    source_name: str,
+    field_tokens: int = PROMPT_FIELD_TOKEN_BUDGET,
+    max_items: int = PROMPT_MAX_LIST_ITEMS,
+) -> str:
     if data is None:
         logger.debug(f"No {source_name} data available")
         return f"No {source_name} data available."
-    return f"Here is {source_name} data:\n{json.dumps(data, indent=2)}"
+    data = compact_data(data, field_tokens, max_items)
+    if not data:
+        # The source was searched and came back empty, which is itself a signal
+        return f"{source_name}: searched, nothing found."
+    encoded = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"Here is {source_name} data:\n{encoded}"
 
 
-async def summarize_company(
+def format_sources_for_prompt(
+    sources: list[tuple[Optional[dict], str]],
+    budget: int = PROMPT_DATA_TOKEN_BUDGET,
+) -> list[str]:
+    # Halve the per-field cap until the data fits in the budget (or can't shrink more)
+    field_tokens = PROMPT_FIELD_TOKEN_BUDGET
+    max_items = PROMPT_MAX_LIST_ITEMS
+    while True:
+        texts = [
+            format_data_for_prompt(data, name, field_tokens, max_items)
+            for data, name in sources
+        ]
+        if sum(estimate_tokens(t) for t in texts) <= budget or field_tokens <= 25:
+            return texts
+        field_tokens //= 2
+        max_items = max(max_items // 2, 3)
+
+
+def choose_summarizer_model(available_sources: int) -> str:
+    if available_sources <= FAST_MODEL_MAX_SOURCES:
+        return SUMMARIZER_FAST_MODEL
+    return SUMMARIZER_MODEL
+
+
+def count_sources(*profiles) -> int:
+    return sum(1 for profile in profiles if profile is not None)
+
+
+def build_summary_prompt(
     company_name: str,
     linkedin: Optional[LinkedInProfile],
     glassdoor: Optional[GlassdoorProfile],
     crunchbase: Optional[CrunchbaseProfile],
     news: Optional[NewsProfile],
-) -> CompanySummaryWithRating:
-    logger.info(f"Starting summary generation for {company_name}")
-
-    linkedin_text = format_data_for_prompt(
-        linkedin.model_dump() if linkedin else None, "LinkedIn"
-    )
-    glassdoor_text = format_data_for_prompt(
-        glassdoor.model_dump() if glassdoor else None, "Glassdoor"
-    )
-    crunchbase_text = format_data_for_prompt(
-        crunchbase.model_dump() if crunchbase else None, "Crunchbase"
-    )
-    news_text = format_data_for_prompt(
-        news.model_dump() if news else None, "recent news"
+) -> str:
+    linkedin_text, glassdoor_text, crunchbase_text, news_text = (
+        format_sources_for_prompt(
+            [
+                (linkedin.model_dump() if linkedin else None, "LinkedIn"),
+                (glassdoor.model_dump() if glassdoor else None, "Glassdoor"),
+                (crunchbase.model_dump() if crunchbase else None, "Crunchbase"),
+                (news.model_dump() if news else None, "recent news"),
+            ]
+        )
     )
 
-    available_sources = sum(
-        1 for x in [linkedin, glassdoor, crunchbase, news] if x is not None
-    )
+    available_sources = count_sources(linkedin, glassdoor, crunchbase, news)
     logger.info(
         f"Generating summary using {available_sources} available data sources for {company_name}"
     )
 
-    prompt = (
+    return (
         f"You're evaluating a company called '{company_name}' for a curious job seeker.\n\n"
         f"{linkedin_text}\n\n"
         f"{glassdoor_text}\n\n"
@@ -120,8 +230,182 @@ async def summarize_company(
         "Then return a Reputato Score between 1 and 5 (as a number, not text)."
     )
 
+
+def canonical_profiles(**profiles) -> dict[str, Optional[dict]]:
+    return {
+        source: profile.model_dump(mode="json") if profile is not None else None
+        for source, profile in profiles.items()
+    }
+
+
+def summary_key(company_name: str, profiles: dict, model: str) -> str:
+    canonical = json.dumps(
+        {
+            "company": match_key(company_name),
+            "profiles": profiles,
+            "model": model,
+            "prompt": [
+                SUMMARY_PROMPT_VERSION,
+                PROMPT_DATA_TOKEN_BUDGET,
+                PROMPT_FIELD_TOKEN_BUDGET,
+                PROMPT_MAX_LIST_ITEMS,
+            ],
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def diff_profile(old: Optional[dict], new: Optional[dict]) -> Optional[dict]:
+    # Changed fields only; for lists (news, reviews) just the entries that are new
+    if new is None or old is None:
+        return new
+    changes = {}
+    for field, value in new.items():
+        previous = old.get(field)
+        if value == previous:
+            continue
+        if isinstance(value, list) and isinstance(previous, list):
+            added = [item for item in value if item not in previous]
+            removed = sum(1 for item in previous if item not in value)
+            changes[field] = {"added": added, "removed_count": removed}
+        else:
+            changes[field] = value
+    return changes
+
+
+def build_update_prompt(
+    company_name: str, previous: dict, changes: dict[str, Optional[dict]]
+) -> str:
+    labels = {
+        "linkedin": "LinkedIn",
+        "glassdoor": "Glassdoor",
+        "crunchbase": "Crunchbase",
+        "news": "recent news",
+    }
+    texts = format_sources_for_prompt(
+        [(diff, f"updated {labels[source]}") for source, diff in changes.items()]
+    )
+    return (
+        f"Earlier you wrote this summary of '{company_name}' for a job seeker "
+        f"and gave it a Reputato Score of {previous['rating']}:\n\n"
+        f"{previous['summary']}\n\n"
+        "Since then only these sources changed (changed fields only; for lists, "
+        "the new entries and how many old ones are gone):\n\n"
+        + "\n\n".join(texts)
+        + "\n\nUpdate the summary with the new information. Keep everything that "
+        "is still accurate, in the same style and length, correct or drop what the "
+        "changes contradict, and don't make things up. If a source has no data "
+        "anymore, say that information is unavailable.\n\n"
+        "Then return a Reputato Score between 1 and 5 (as a number, not text), "
+        "changing it only if the new information warrants it."
+    )
+
+
+def plan_summary(
+    company_name: str,
+    linkedin: Optional[LinkedInProfile],
+    glassdoor: Optional[GlassdoorProfile],
+    crunchbase: Optional[CrunchbaseProfile],
+    news: Optional[NewsProfile],
+) -> dict:
+    # Memoized output if the inputs are unchanged, otherwise the prompt to run:
+    # a full one, or an update of the previous summary when little changed
+    profiles = canonical_profiles(
+        linkedin=linkedin, glassdoor=glassdoor, crunchbase=crunchbase, news=news
+    )
+    model = choose_summarizer_model(
+        count_sources(linkedin, glassdoor, crunchbase, news)
+    )
+    plan = {
+        "key": summary_key(company_name, profiles, model),
+        "model": model,
+        "profiles": profiles,
+    }
+    memoized = summary_memo.get(plan["key"])
+    if memoized is not None:
+        logger.info(f"Reusing memoized summary for {company_name}")
+        return {**plan, "mode": "memo", "output": memoized}
+
+    previous = summary_memo.get(f"latest:{match_key(company_name)}")
+    if (
+        SUMMARY_INCREMENTAL
+        and previous is not None
+        and previous["version"] == SUMMARY_PROMPT_VERSION
+    ):
+        changed = [
+            source
+            for source, data in profiles.items()
+            if data != previous["profiles"].get(source)
+        ]
+        if 0 < len(changed) <= SUMMARY_INCREMENTAL_MAX_SOURCES:
+            logger.info(f"Updating the summary of {company_name} for {changed}")
+            changes = {
+                source: diff_profile(previous["profiles"].get(source), profiles[source])
+                for source in changed
+            }
+            prompt = build_update_prompt(company_name, previous, changes)
+            return {**plan, "mode": "incremental", "prompt": prompt}
+
+    prompt = build_summary_prompt(company_name, linkedin, glassdoor, crunchbase, news)
+    return {**plan, "mode": "full", "prompt": prompt}
+
+
+def remember_summary(
+    company_name: str, plan: dict, output: CompanySummaryWithRating
+) -> None:
+    summary_memo.set(plan["key"], output.model_dump())
+    # The latest summary per company is the base for incremental updates
+    summary_memo.set(
+        f"latest:{match_key(company_name)}",
+        {
+            **output.model_dump(),
+            "profiles": plan["profiles"],
+            "version": SUMMARY_PROMPT_VERSION,
+        },
+    )
+
+
+def log_usage(company_name: str, model: str, result, started: float) -> None:
+    usage = result.usage()
+    logger.info(
+        f"Summary for {company_name}: model={model} "
+        f"input_tokens={usage.request_tokens} output_tokens={usage.response_tokens} "
+        f"latency={time.perf_counter() - started:.2f}s"
+    )
+
+
+async def summarize_company(
+    company_name: str,
+    linkedin: Optional[LinkedInProfile],
+    glassdoor: Optional[GlassdoorProfile],
+    crunchbase: Optional[CrunchbaseProfile],
+    news: Optional[NewsProfile],
+) -> CompanySummaryWithRating:
+    logger.info(f"Starting summary generation for {company_name}")
+    plan = await summary_memo.offload(
+        plan_summary, company_name, linkedin, glassdoor, crunchbase, news
+    )
+    metrics.SUMMARIES.inc(mode=plan["mode"])
+    if plan["mode"] == "memo":
+        output = CompanySummaryWithRating(**plan["output"])
+        output.summary = clean_summary(output.summary)
+        return output
+    model, prompt = plan["model"], plan["prompt"]
+    logger.info(
+        f"Summarizing {company_name} with {model} (~{estimate_tokens(prompt)} prompt tokens)"
+    )
+
+    started = time.perf_counter()
+    outcome = "failure"
     try:
-        result = await summarizer_agent.run(prompt)
+        result = await summarizer_agent.run(prompt, model=model)
+        outcome = "success"
+        metrics.record_run("summarizer", result)
+        log_usage(company_name, model, result, started)
+        await summary_memo.offload(remember_summary, company_name, plan, result.output)
         result.output.summary = clean_summary(result.output.summary)
         logger.info(
             f"Successfully generated summary for {company_name} with rating {result.output.rating}"
@@ -133,3 +417,81 @@ async def summarize_company(
             f"Error generating summary for {company_name}: {str(e)}", exc_info=True
         )
         raise
+    finally:
+        metrics.SUMMARIZER_DURATION.observe(
+            time.perf_counter() - started, model=model, outcome=outcome
+        )
+
+
+def partial_summary(message: ModelResponse) -> Optional[str]:
+    # Pull the summary generated so far out of the (incomplete) output tool call
+    for part in message.parts:
+        if isinstance(part, ToolCallPart):
+            args = part.args
+            if isinstance(args, str):
+                try:
+                    args = pydantic_core.from_json(
+                        args, allow_partial="trailing-strings"
+                    )
+                except ValueError:
+                    return None
+            if isinstance(args, dict) and isinstance(args.get("summary"), str):
+                return args["summary"]
+    return None
+
+
+async def summarize_company_stream(
+    company_name: str,
+    linkedin: Optional[LinkedInProfile],
+    glassdoor: Optional[GlassdoorProfile],
+    crunchbase: Optional[CrunchbaseProfile],
+    news: Optional[NewsProfile],
+) -> AsyncIterator[Union[str, CompanySummaryWithRating]]:
+    # Yields raw summary text deltas as they arrive, then the cleaned final output
+    logger.info(f"Starting streamed summary generation for {company_name}")
+    plan = await summary_memo.offload(
+        plan_summary, company_name, linkedin, glassdoor, crunchbase, news
+    )
+    metrics.SUMMARIES.inc(mode=plan["mode"])
+    if plan["mode"] == "memo":
+        output = CompanySummaryWithRating(**plan["output"])
+        output.summary = clean_summary(output.summary)
+        yield output.summary
+        yield output
+        return
+    model, prompt = plan["model"], plan["prompt"]
+    logger.info(
+        f"Summarizing {company_name} with {model} (~{estimate_tokens(prompt)} prompt tokens)"
+    )
+
+    sent = ""
+    started = time.perf_counter()
+    outcome = "failure"
+    try:
+        async with summarizer_agent.run_stream(prompt, model=model) as result:
+            async for message, is_last in result.stream_structured(debounce_by=0.05):
+                text = partial_summary(message)
+                if text and text.startswith(sent) and len(text) > len(sent):
+                    yield text[len(sent) :]
+                    sent = text
+                if is_last:
+                    output = await result.validate_structured_output(message)
+        outcome = "success"
+        metrics.record_run("summarizer", result)
+        log_usage(company_name, model, result, started)
+    except Exception as e:
+        logger.error(
+            f"Error streaming summary for {company_name}: {str(e)}", exc_info=True
+        )
+        raise
+    finally:
+        metrics.SUMMARIZER_DURATION.observe(
+            time.perf_counter() - started, model=model, outcome=outcome
+        )
+
+    await summary_memo.offload(remember_summary, company_name, plan, output)
+    output.summary = clean_summary(output.summary)
+    logger.info(
+        f"Successfully streamed summary for {company_name} with rating {output.rating}"
+    )
+    yield output
@@ -0,0 +1,6 @@
+# Rough token estimate shared by the prompt budgets and the tool output stats
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
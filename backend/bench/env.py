@@ -0,0 +1,40 @@
+import os
+import shlex
+import sys
+
+FAKE_MCP_SERVER = os.path.join(os.path.dirname(__file__), "fake_mcp_server.py")
+
+
+def configure() -> None:
+    # Dummy credentials: nothing leaves the machine during a benchmark
+    for var in [
+        "BRIGHTDATA_API_TOKEN",
+        "BRIGHTDATA_GLASSDOOR_UNLOCKER_ZONE",
+        "BRIGHTDATA_LINKEDIN_UNLOCKER_ZONE",
+        "BRIGHTDATA_CRUNCHBASE_UNLOCKER_ZONE",
+        "BRIGHTDATA_NEWS_UNLOCKER_ZONE",
+        "ANTHROPIC_API_KEY",
+    ]:
+        os.environ.setdefault(var, "bench")
+    os.environ.setdefault("REPUTATO_API_KEY", "bench")
+    os.environ.setdefault("FRONTEND_URL", "http://localhost:8501")
+    os.environ.setdefault("LOGFIRE_SEND_TO_LOGFIRE", "false")
+    os.environ.setdefault("LOGFIRE_CONSOLE", "false")
+    # Every request should reach the fake server unless a benchmark opts into the store
+    os.environ.setdefault("SCRAPE_STORE_DIR", "")
+    # Fake runs would otherwise end up in the learned agent budgets
+    os.environ.setdefault("AGENT_BUDGET_DB_PATH", "")
+    os.environ["MCP_COMMAND"] = sys.executable
+    os.environ["MCP_ARGS"] = " ".join(
+        [
+            shlex.quote(FAKE_MCP_SERVER),
+            "--latency",
+            os.getenv("BENCH_TOOL_LATENCY", "0.5"),
+            "--jitter",
+            os.getenv("BENCH_TOOL_JITTER", "0.2"),
+            "--payload-bytes",
+            os.getenv("BENCH_PAYLOAD_BYTES", "20000"),
+            "--error-rate",
+            os.getenv("BENCH_TOOL_ERROR_RATE", "0"),
+        ]
+    )
@@ -0,0 +1,125 @@
+"""Stand-in for `npx @brightdata/mcp` that serves canned pages over stdio.
+
+Speaks the same tool names as the Bright Data MCP server, with configurable latency
+and payload size, so the backend can be load tested without scraping anything.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+
+from mcp.server.fastmcp import FastMCP
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--latency", type=float, default=0.5, help="Mean tool latency (s)")
+parser.add_argument("--jitter", type=float, default=0.2, help="Latency jitter (s)")
+parser.add_argument("--payload-bytes", type=int, default=20_000)
+parser.add_argument("--error-rate", type=float, default=0.0)
+args = parser.parse_args()
+
+server = FastMCP("fake-brightdata", log_level="WARNING")
+current_url = {"url": "https://example.com"}
+
+BOILERPLATE = [
+    "Sign In",
+    "Join now",
+    "Cookie Policy",
+    "Privacy Terms",
+    "Home Jobs Companies Salaries",
+    "Download the app",
+]
+CONTENT = [
+    "Overall rating 4.1 out of 5 based on 1,234 reviews.",
+    "Pros: great colleagues, flexible hours, interesting problems. (2025)",
+    "Cons: slow promotions, reorgs every quarter. (2024)",
+    "Series C funding round of $120M announced on 2024-03-12.",
+    "Investors: Example Ventures, Sample Capital, Placeholder Partners.",
+    "Founded in 2015. Headquarters: Springfield.",
+]
+
+
+def slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def page(url: str) -> str:
+    # Deterministic pseudo-page: repeated navigation chrome around some content
+    rng = random.Random(url)
+    lines = []
+    while sum(len(line) + 1 for line in lines) < args.payload_bytes:
+        pool = BOILERPLATE if rng.random() < 0.6 else CONTENT
+        lines.append(rng.choice(pool))
+    return f"Page: {url}\n" + "\n".join(lines)
+
+
+async def respond(text):
+    await asyncio.sleep(max(0.0, random.gauss(args.latency, args.jitter)))
+    if random.random() < args.error_rate:
+        raise RuntimeError("Simulated upstream failure")
+    return text
+
+
+@server.tool()
+async def search_engine(query: str, engine: str = "google") -> str:
+    company = slug(query.split(" site:")[0])
+    results = [
+        f"1. {company} | LinkedIn https://www.linkedin.com/company/{company}",
+        f"2. {company} reviews https://www.glassdoor.com/Reviews/{company}.htm",
+        f"3. {company} https://www.crunchbase.com/organization/{company}",
+    ]
+    return await respond("\n".join(results))
+
+
+@server.tool()
+async def scrape_as_markdown(url: str) -> str:
+    return await respond(page(url))
+
+
+@server.tool()
+async def scrape_as_html(url: str) -> str:
+    body = page(url).replace("\n", "</p><p>")
+    return await respond(f"<html><body><p>{body}</p></body></html>")
+
+
+@server.tool()
+async def scraping_browser_navigate(url: str) -> str:
+    current_url["url"] = url
+    return await respond(f"Navigated to {url}")
+
+
+@server.tool()
+async def scraping_browser_get_text() -> str:
+    return await respond(page(current_url["url"]))
+
+
+@server.tool()
+async def scraping_browser_click(selector: str) -> str:
+    return await respond(f"Clicked {selector}")
+
+
+@server.tool()
+async def scraping_browser_links() -> str:
+    links = [{"text": "Reviews", "href": current_url["url"] + "/reviews"}]
+    return await respond(json.dumps(links))
+
+
+@server.tool()
+async def web_data_linkedin_company_profile(url: str) -> str:
+    name = url.rstrip("/").rsplit("/", 1)[-1].replace("-", " ")
+    record = {
+        "name": name,
+        "about": f"{name} makes things.",
+        "company_size": "201-500 employees",
+        "url": url,
+        "headquarters": "Springfield",
+        "founded": 2015,
+        "industries": "Software Development",
+        "website": f"https://{slug(name)}.example.com",
+    }
+    return await respond(json.dumps([record]))
+
+
+if __name__ == "__main__":
+    server.run("stdio")
@@ -0,0 +1,15 @@
+"""The shared MCP gateway with the fake MCP server, for `bench.run --gateway`."""
+
+import argparse
+import asyncio
+
+from bench.env import configure
+
+configure()
+
+from app.gateway import serve  # noqa: E402
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--socket", required=True)
+    asyncio.run(serve(parser.parse_args().socket))
@@ -0,0 +1,257 @@
+"""Load test the backend offline: stub models, fake MCP server, real FastAPI app.
+
+Example:
+    cd backend
+    python -m bench.run --workers 2 --concurrency 16 --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+import psutil
+
+API_KEY = "bench"
+GATEWAY_SOCKET = f"/tmp/reputato-bench-{os.getpid()}.sock"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument(
+        "--companies",
+        type=int,
+        default=50,
+        help="Distinct company names to cycle through",
+    )
+    parser.add_argument(
+        "--endpoint",
+        default="analyze_company",
+        choices=["analyze_company", "analyze_company/stream"],
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Bypass the caches so every request runs the full pipeline",
+    )
+    parser.add_argument("--tool-latency", type=float, default=0.5)
+    parser.add_argument("--tool-jitter", type=float, default=0.2)
+    parser.add_argument("--payload-bytes", type=int, default=20_000)
+    parser.add_argument("--tool-error-rate", type=float, default=0.0)
+    parser.add_argument("--model-latency", type=float, default=0.3)
+    parser.add_argument("--summarizer-latency", type=float, default=2.0)
+    parser.add_argument("--mcp-pool-size", type=int, default=1)
+    parser.add_argument(
+        "--gateway",
+        action="store_true",
+        help="Share one MCP gateway process between the workers (like run.py --prod)",
+    )
+    parser.add_argument("--json", help="Also write the report to this file")
+    return parser.parse_args()
+
+
+def server_env(args) -> dict:
+    return {
+        **os.environ,
+        "REPUTATO_API_KEY": API_KEY,
+        "BENCH_TOOL_LATENCY": str(args.tool_latency),
+        "BENCH_TOOL_JITTER": str(args.tool_jitter),
+        "BENCH_PAYLOAD_BYTES": str(args.payload_bytes),
+        "BENCH_TOOL_ERROR_RATE": str(args.tool_error_rate),
+        "BENCH_MODEL_LATENCY": str(args.model_latency),
+        "BENCH_SUMMARIZER_LATENCY": str(args.summarizer_latency),
+        "MCP_POOL_SIZE": str(args.mcp_pool_size),
+        "CACHE_BACKEND": "memory",
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+    }
+
+
+def start_gateway(args) -> subprocess.Popen:
+    if os.path.exists(GATEWAY_SOCKET):
+        os.unlink(GATEWAY_SOCKET)
+    gateway = subprocess.Popen(
+        [sys.executable, "-m", "bench.gateway", "--socket", GATEWAY_SOCKET],
+        env=server_env(args),
+    )
+    deadline = time.monotonic() + 120
+    while not os.path.exists(GATEWAY_SOCKET):
+        if gateway.poll() is not None or time.monotonic() > deadline:
+            gateway.terminate()
+            raise RuntimeError("MCP gateway did not start")
+        time.sleep(0.2)
+    return gateway
+
+
+def start_server(args) -> subprocess.Popen:
+    env = server_env(args)
+    if args.gateway:
+        env["MCP_GATEWAY_SOCKET"] = GATEWAY_SOCKET
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "bench.serve:app",
+        "--port",
+        str(args.port),
+        "--workers",
+        str(args.workers),
+        "--log-level",
+        "warning",
+    ]
+    return subprocess.Popen(command, env=env)
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/metrics")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise TimeoutError("Backend did not start in time")
+
+
+async def one_request(client: httpx.AsyncClient, args, name: str) -> tuple:
+    params = {"name": name, "refresh": str(args.refresh).lower()}
+    headers = {"x-api-key": API_KEY}
+    started = time.perf_counter()
+    first_byte = None
+    if args.endpoint == "analyze_company":
+        response = await client.get(f"/{args.endpoint}", params=params, headers=headers)
+        ok = response.status_code == 200
+    else:
+        ok = False
+        async with client.stream(
+            "GET", f"/{args.endpoint}", params=params, headers=headers
+        ) as response:
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started
+                ok = json.loads(line).get("type") == "result"
+    return ok, time.perf_counter() - started, first_byte
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def is_mcp_server(process: psutil.Process) -> bool:
+    return "fake_mcp_server" in " ".join(process.cmdline())
+
+
+def worker_memory(server: subprocess.Popen) -> list[float]:
+    # RSS (MiB) of each uvicorn worker, or the single process when --workers 1
+    parent = psutil.Process(server.pid)
+    workers = [
+        child
+        for child in parent.children()
+        if "python" in child.name().lower()
+        and not is_mcp_server(child)
+        and "resource_tracker" not in " ".join(child.cmdline())
+    ]
+    processes = workers or [parent]
+    return [round(p.memory_info().rss / 2**20, 1) for p in processes]
+
+
+def mcp_servers(*roots: subprocess.Popen) -> tuple[int, float]:
+    # Count and total RSS (MiB) of MCP server processes under the given processes
+    servers = [
+        child
+        for root in roots
+        for child in psutil.Process(root.pid).children(recursive=True)
+        if is_mcp_server(child)
+    ]
+    return len(servers), round(sum(p.memory_info().rss for p in servers) / 2**20, 1)
+
+
+async def drive(args, server: subprocess.Popen, gateway=None) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=None
+    ) as client:
+        await wait_until_ready(client)
+        names = [f"Bench Co {i % args.companies}" for i in range(args.requests)]
+        queue: asyncio.Queue[str] = asyncio.Queue()
+        for name in names:
+            queue.put_nowait(name)
+        results = []
+
+        async def user():
+            while not queue.empty():
+                name = queue.get_nowait()
+                try:
+                    results.append(await one_request(client, args, name))
+                except httpx.HTTPError:
+                    results.append((False, 0.0, None))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies = [latency for ok, latency, _ in results if ok]
+    first_bytes = [fb for ok, _, fb in results if ok and fb is not None]
+    report = {
+        "endpoint": args.endpoint,
+        "workers": args.workers,
+        "gateway": args.gateway,
+        "concurrency": args.concurrency,
+        "requests": len(results),
+        "errors": sum(1 for ok, _, _ in results if not ok),
+        "elapsed_s": round(elapsed, 3),
+        "req_per_s": round(len(results) / elapsed, 2),
+        "p50_s": round(percentile(latencies, 50), 3),
+        "p95_s": round(percentile(latencies, 95), 3),
+        "p99_s": round(percentile(latencies, 99), 3),
+        "mean_s": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "worker_rss_mib": worker_memory(server),
+    }
+    roots = [server] + ([gateway] if gateway else [])
+    report["mcp_processes"], report["mcp_rss_mib"] = mcp_servers(*roots)
+    if gateway:
+        report["gateway_rss_mib"] = round(
+            psutil.Process(gateway.pid).memory_info().rss / 2**20, 1
+        )
+    if first_bytes:
+        report["first_event_p50_s"] = round(percentile(first_bytes, 50), 3)
+        report["first_event_p95_s"] = round(percentile(first_bytes, 95), 3)
+    return report
+
+
+def main():
+    args = parse_args()
+    gateway = start_gateway(args) if args.gateway else None
+    server = start_server(args)
+    try:
+        report = asyncio.run(drive(args, server, gateway))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        if gateway:
+            gateway.terminate()
+            gateway.wait(timeout=30)
+    for key, value in report.items():
+        print(f"{key:>18}: {value}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""The real FastAPI app with stub models and the fake MCP server plugged in.
+
+Run through `python -m bench.run`, which starts this under uvicorn. Settings come
+from BENCH_* environment variables so every uvicorn worker picks them up.
+"""
+
+import os
+from contextlib import ExitStack
+
+from bench.env import configure
+
+configure()
+
+from app import main, summarizer  # noqa: E402
+from bench.stubs import source_model, summarizer_model  # noqa: E402
+
+MODEL_LATENCY = float(os.getenv("BENCH_MODEL_LATENCY", "0.3"))
+SUMMARIZER_LATENCY = float(os.getenv("BENCH_SUMMARIZER_LATENCY", "2"))
+
+_overrides = ExitStack()
+for source, (pool, _, _) in main.SOURCES.items():
+    for agent in pool.agents:
+        _overrides.enter_context(
+            agent.override(model=source_model(source, MODEL_LATENCY))
+        )
+_overrides.enter_context(
+    summarizer.summarizer_agent.override(model=summarizer_model(SUMMARIZER_LATENCY))
+)
+
+app = main.app
@@ -0,0 +1,121 @@
+"""Scripted stand-ins for the Haiku source agents and the Sonnet summarizer."""
+
+import asyncio
+import json
+from typing import AsyncIterator
+
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    ToolCallPart,
+    ToolReturnPart,
+)
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, FunctionModel
+
+# Tool calls each source agent makes before answering, mirroring the prompts
+SOURCE_SCRIPTS = {
+    "linkedin": [
+        (
+            "web_data_linkedin_company_profile",
+            {"url": "https://www.linkedin.com/company/x"},
+        )
+    ],
+    "glassdoor": [
+        (
+            "scraping_browser_navigate",
+            {"url": "https://www.glassdoor.com/Reviews/x.htm"},
+        ),
+        ("scraping_browser_get_text", {}),
+    ],
+    "crunchbase": [
+        (
+            "scraping_browser_navigate",
+            {"url": "https://www.crunchbase.com/organization/x"},
+        ),
+        ("scraping_browser_get_text", {}),
+    ],
+    "news": [
+        ("search_engine", {"query": "x news 2025"}),
+        ("scrape_as_markdown", {"url": "https://news.example.com/x"}),
+    ],
+}
+
+SUMMARY = (
+    "They make software and seem to be doing fine. Reviews are mixed but mostly "
+    "positive, funding looks healthy and there is no obvious drama in the news. "
+    "Seems solid, worth an application."
+)
+
+
+def sample_from_schema(schema: dict, defs: dict | None = None):
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return sample_from_schema(defs[schema["$ref"].split("/")[-1]], defs)
+    if "anyOf" in schema:
+        options = [s for s in schema["anyOf"] if s.get("type") != "null"]
+        return sample_from_schema(options[0], defs) if options else None
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            key: sample_from_schema(value, defs)
+            for key, value in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [sample_from_schema(schema.get("items", {}), defs)]
+    if kind == "integer":
+        return 120
+    if kind == "number":
+        return 4.1
+    if kind == "boolean":
+        return True
+    return "stub"
+
+
+def _tool_returns(messages: list[ModelMessage]) -> int:
+    return sum(
+        1
+        for message in messages
+        if isinstance(message, ModelRequest)
+        for part in message.parts
+        if isinstance(part, ToolReturnPart)
+    )
+
+
+def source_model(source: str, latency: float) -> FunctionModel:
+    script = SOURCE_SCRIPTS[source]
+
+    async def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        await asyncio.sleep(latency)
+        step = _tool_returns(messages)
+        if step < len(script):
+            tool_name, args = script[step]
+            return ModelResponse(parts=[ToolCallPart(tool_name, args)])
+        output_tool = info.output_tools[0]
+        args = sample_from_schema(output_tool.parameters_json_schema)
+        return ModelResponse(parts=[ToolCallPart(output_tool.name, args)])
+
+    return FunctionModel(respond, model_name=f"stub-{source}")
+
+
+def summarizer_model(latency: float, chunks: int = 20) -> FunctionModel:
+    def output_args(rating: int = 4) -> str:
+        return json.dumps({"summary": SUMMARY, "rating": rating})
+
+    async def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        await asyncio.sleep(latency)
+        return ModelResponse(
+            parts=[ToolCallPart(info.output_tools[0].name, output_args())]
+        )
+
+    async def stream(
+        messages: list[ModelMessage], info: AgentInfo
+    ) -> AsyncIterator[dict[int, DeltaToolCall]]:
+        args = output_args()
+        size = max(1, len(args) // chunks)
+        yield {0: DeltaToolCall(name=info.output_tools[0].name)}
+        for start in range(0, len(args), size):
+            await asyncio.sleep(latency / chunks)
+            yield {0: DeltaToolCall(json_args=args[start : start + size])}
+
+    return FunctionModel(respond, stream_function=stream, model_name="stub-summarizer")
@@ -1,4 +1,63 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
 import uvicorn
 
+
+def start_gateway(socket_path: str, timeout: float) -> subprocess.Popen:
+    # One process owns the MCP servers; the API workers connect to it over a socket
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    gateway = subprocess.Popen(
+        [sys.executable, "-m", "app.gateway", "--socket", socket_path]
+    )
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(socket_path):
+        if gateway.poll() is not None:
+            raise SystemExit(f"MCP gateway exited with code {gateway.returncode}")
+        if time.monotonic() > deadline:
+            gateway.terminate()
+            raise SystemExit("MCP gateway did not start in time")
+        time.sleep(0.2)
+    return gateway
+
+
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--prod",
+        action="store_true",
+        help="Multiple API workers sharing one MCP gateway process (no reload)",
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "0"))
+    )
+    parser.add_argument(
+        "--socket",
+        default=os.getenv("MCP_GATEWAY_SOCKET", "/tmp/reputato-mcp.sock"),
+    )
+    args = parser.parse_args()
+
+    if not args.prod:
+        uvicorn.run("app.main:app", host=args.host, port=args.port, reload=True)
+        sys.exit()
+
+    gateway = start_gateway(
+        args.socket, float(os.getenv("MCP_STARTUP_TIMEOUT", "60")) + 30
+    )
+    os.environ["MCP_GATEWAY_SOCKET"] = args.socket
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers or os.cpu_count(),
+        )
+    finally:
+        gateway.terminate()
+        gateway.wait(timeout=60)
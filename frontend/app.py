@@ -1,7 +1,68 @@
+import json
+import time
+
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 BACKEND_URL = st.secrets["backend"]["url"]
+# (connect, read) timeouts in seconds; the read timeout is the longest the stream may
+# stay quiet, which covers the slowest source deadline plus the summary
+QUICK_TIMEOUT = (3.05, 10)
+STREAM_TIMEOUT = (3.05, 330)
+# A company this user looked at recently is shown again without asking the backend
+RESULT_TTL = 15 * 60
+MAX_RECENT_RESULTS = 20
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    # One pooled session for every user and rerun, so connections are reused
+    session = requests.Session()
+    retries = Retry(
+        total=2,
+        read=0,
+        backoff_factor=0.5,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["x-api-key"] = st.secrets["backend"]["apikey"]
+    return session
+
+
+@st.cache_data(ttl=60 * 60, show_spinner=False)
+def suggest_companies(name: str) -> list[str]:
+    # Typo check against companies we've seen before, no scraping involved
+    response = get_session().get(
+        f"{BACKEND_URL}/companies/resolve", params={"name": name}, timeout=QUICK_TIMEOUT
+    )
+    if response.status_code != 200:
+        return []
+    return [s["name"] for s in response.json()["suggestions"][:3]]
+
+
+def company_key(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+def recent_result(name: str):
+    results = st.session_state.setdefault("results", {})
+    for key, entry in list(results.items()):
+        if time.time() - entry["at"] > RESULT_TTL:
+            del results[key]
+    return results.get(company_key(name))
+
+
+def remember_result(name: str, sources: dict, event: dict):
+    results = st.session_state.setdefault("results", {})
+    results[company_key(name)] = {"at": time.time(), "sources": sources, **event}
+    while len(results) > MAX_RECENT_RESULTS:
+        del results[min(results, key=lambda key: results[key]["at"])]
+
 
 st.set_page_config(page_title="Reputato", page_icon="🥔")
 st.title("🥔 Reputato")
@@ -14,38 +75,107 @@ st.caption(
 company_name = st.text_input("Company name", placeholder="e.g. Google")
 submit = st.button("Analyze")
 
-# --- Placeholder for results ---
+SOURCE_LABELS = {
+    "linkedin": "LinkedIn",
+    "glassdoor": "Glassdoor",
+    "crunchbase": "Crunchbase",
+    "news": "News",
+}
+
+
+def render_rating(rating: int):
+    full = "🥔"
+    empty = "<span style='opacity:0.3;'>🥔</span>"
+    rating_str = full * rating + empty * (5 - rating)
+    st.markdown("### Reputato Score")
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown(
+        f"<div style='font-size: 1.8rem;'>{rating_str}</div>",
+        unsafe_allow_html=True,
+    )
+
+
+# --- Placeholders for results, filled in as the backend streams them ---
+status_container = st.empty()
+suggestions_container = st.empty()
+sources_container = st.empty()
+summary_container = st.empty()
 result_container = st.empty()
 
-if submit and company_name.strip():
-    with st.spinner("Analyzing... getting potatoes ready"):
-        try:
-            headers = {"x-api-key": st.secrets["backend"]["apikey"]}
-            params = {"name": company_name}
-            response = requests.get(
-                f"{BACKEND_URL}/analyze_company", params=params, headers=headers
-            )
-
-            if response.status_code == 200:
-                data = response.json()
-                summary = data.get("summary")
-                rating = data.get("rating", 1)
-
-                full = "🥔"
-                empty = "<span style='opacity:0.3;'>🥔</span>"
-                rating_str = full * rating + empty * (5 - rating)
-
-                with result_container.container():
-                    st.success("Done!")
-                    st.markdown("### Company Summary")
-                    st.write(summary)
-                    st.markdown("### Reputato Score")
-                    st.markdown("<br>", unsafe_allow_html=True)
-                    st.markdown(
-                        f"<div style='font-size: 1.8rem;'>{rating_str}</div>",
-                        unsafe_allow_html=True,
-                    )
+
+def render_sources(sources: dict):
+    if not sources:
+        return
+    sources_container.markdown(
+        " · ".join(
+            f"{status} {SOURCE_LABELS[source]}" for source, status in sources.items()
+        )
+    )
+
+
+def render_result(event: dict):
+    with summary_container.container():
+        st.markdown("### Company Summary")
+        st.write(event["summary"])
+        if event.get("stale"):
+            st.caption("From an earlier analysis, a fresh one is on its way.")
+    with result_container.container():
+        render_rating(event.get("rating", 1))
+
+
+cached = recent_result(company_name) if submit and company_name.strip() else None
+if cached:
+    status_container.success("Done! (you looked this one up a moment ago)")
+    render_sources(cached["sources"])
+    render_result(cached)
+elif submit and company_name.strip():
+    try:
+        params = {"name": company_name}
+        status_container.info("Analyzing... getting potatoes ready")
+        suggestions = suggest_companies(company_name.strip())
+        if suggestions:
+            suggestions_container.caption(f"Did you mean: {', '.join(suggestions)}?")
+        sources = {source: "⏳" for source in SOURCE_LABELS}
+        summary = ""
+
+        render_sources(sources)
+        with get_session().get(
+            f"{BACKEND_URL}/analyze_company/stream",
+            params=params,
+            stream=True,
+            timeout=STREAM_TIMEOUT,
+        ) as response:
+            if response.status_code != 200:
+                status_container.error("Something went wrong.")
             else:
-                result_container.error("Something went wrong.")
-        except Exception as e:
-            result_container.error(f"Request failed: {e}")
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event["type"] == "profile":
+                        sources[event["source"]] = "✅" if event["data"] else "❌"
+                        render_sources(sources)
+                    elif event["type"] == "summary":
+                        if not summary:
+                            status_container.info("Writing the summary...")
+                        summary += event["delta"]
+                        summary_container.markdown(
+                            "### Company Summary\n\n" + summary.replace("$", "\\$")
+                        )
+                    elif event["type"] == "result":
+                        status_container.success("Done!")
+                        if event.get("cached"):
+                            # Answered from the backend cache, no per-source progress
+                            sources = {}
+                            sources_container.empty()
+                        render_result(event)
+                        if not event.get("stale"):
+                            remember_result(company_name, sources, event)
+                    elif event["type"] == "error":
+                        status_container.error("Something went wrong.")
+    except requests.Timeout:
+        status_container.error("The backend took too long to answer, try again.")
+    except requests.ConnectionError:
+        status_container.error("Could not reach the backend.")
+    except Exception as e:
+        status_container.error(f"Request failed: {e}")